@@ -0,0 +1,50 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from solver import SimplexSolver, Unbounded, Infeasible
+
+# Solving many independent programmes across a process pool.
+
+
+def solve_one(programme, engine='fraction', pivot_rule='dantzig'):
+    """Solve one programme and describe the outcome as a plain dict.
+
+    Errors (Unbounded, Infeasible or anything raised by a malformed programme)
+    are reported in the result instead of being raised.
+    """
+    try:
+        s = SimplexSolver(programme, engine=engine, history=False, pivot_rule=pivot_rule)
+    except Unbounded as e:
+        return {'status': 'unbounded', 'error': str(e)}
+    except Infeasible as e:
+        return {'status': 'infeasible', 'error': str(e)}
+    except Exception as e:
+        return {'status': 'error', 'error': f'{type(e).__name__}: {e}'}
+    return {'status': 'optimal', **s.solution(), **s.stats()}
+
+
+def _solve_chunk(chunk, engine, pivot_rule):
+    return [(i, solve_one(p, engine, pivot_rule)) for i, p in chunk]
+
+
+def solve_many(programmes, engine='fraction', pivot_rule='dantzig', workers=None, chunksize=None):
+    """Yield (index, result) pairs in completion order.
+
+    Programmes are sent to the pool in chunks of `chunksize` so the IPC cost
+    is paid once per chunk; by default every worker gets about four chunks.
+    `result` is the dict returned by solve_one.
+    """
+    programmes = list(programmes)
+    workers = workers or os.cpu_count() or 1
+    if not chunksize:
+        chunksize = max(1, len(programmes)//(workers*4))
+    indexed = list(enumerate(programmes))
+    chunks = [indexed[i:i+chunksize] for i in range(0, len(indexed), chunksize)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_solve_chunk, chunk, engine, pivot_rule): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                # the worker itself died, fail the whole chunk but keep going
+                results = [(i, {'status': 'error', 'error': str(e)}) for i, _ in futures[future]]
+            yield from results
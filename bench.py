@@ -0,0 +1,183 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from solver import SimplexSolver, Unbounded, Infeasible
+from readers import read_lp
+
+# Benchmark suite: every engine on seeded generated families and the classic
+# programmes of benchmarks/*.lp, reporting time, iterations, peak traced
+# memory and whether the optimum agrees with the exact 'fraction' engine.
+#
+#   python bench.py --size small --out results.json
+#   python bench.py --compare results.json   (ratios against an older run)
+
+ENGINES = ['fraction', 'sparse', 'bareiss', 'mixed', 'float', 'revised']
+SIZES = {
+    'small': [(10, 20), (20, 40)],
+    'medium': [(10, 20), (20, 40), (40, 80)],
+    'large': [(20, 40), (40, 80), (80, 160)],
+}
+# classic programmes that need another pivot rule than dantzig to terminate
+RULES = {'beale': 'bland'}
+
+
+def dense(m, n, seed):
+    rd = random.Random(seed)
+    return {
+        'function': [rd.randint(1, 30) for _ in range(n)],
+        'contraintes': [[[rd.randint(1, 20) for _ in range(n)], rd.randint(100, 1000)] for _ in range(m)],
+    }
+
+
+def sparse(m, n, seed, density=0.1):
+    rd = random.Random(seed)
+    A = [{j: rd.randint(1, 9) for j in range(n) if rd.random() < density} for _ in range(m)]
+    for j in range(n):
+        A[rd.randrange(m)][j] = rd.randint(1, 9)
+    return {
+        'function': [rd.randint(1, 20) for _ in range(n)],
+        'contraintes': [[row, rd.randint(10, 100)] for row in A],
+    }
+
+
+def degenerate(m, n, seed):
+    """Every row is tight at one sparse vertex x0, so most pivots are degenerate."""
+    rd = random.Random(seed)
+    x0 = [rd.randint(1, 3) if rd.random() < 0.2 else 0 for _ in range(n)]
+    rows = []
+    for _ in range(m):
+        a = [rd.randint(-3, 9) for _ in range(n)]
+        rows.append([a, max(0, sum(v*x for v, x in zip(a, x0)))])
+    rows.append([[1]*n, 10*n])
+    return {'function': [rd.randint(1, 20) for _ in range(n)], 'contraintes': rows}
+
+
+def klee_minty(n):
+    """Dantzig's rule visits all 2^n vertices."""
+    return {
+        'function': [2**(n-j-1) for j in range(n)],
+        'contraintes': [[[2**(i-j+1) if j < i else 1 if j == i else 0 for j in range(n)], 5**(i+1)] for i in range(n)],
+    }
+
+
+def instances(size, seed):
+    for m, n in SIZES[size]:
+        yield 'dense', f'dense-{m}x{n}', dense(m, n, seed)
+        yield 'sparse', f'sparse-{m}x{n}', sparse(m, n, seed)
+        yield 'degenerate', f'degenerate-{m}x{n}', degenerate(m, n, seed)
+    for n in range(3, 3+2*len(SIZES[size]), 2):
+        yield 'klee-minty', f'klee-minty-{n}', klee_minty(n)
+    here = os.path.dirname(os.path.abspath(__file__))
+    for path in sorted(glob.glob(os.path.join(here, 'benchmarks', '*.lp'))):
+        yield 'classic', os.path.splitext(os.path.basename(path))[0], read_lp(path)
+
+
+def run(programme, engine, pivot_rule):
+    """One solve: (result dict, z or status)."""
+    start = time.perf_counter()
+    try:
+        s = SimplexSolver(programme, engine=engine, history=False, pivot_rule=pivot_rule)
+    except (Unbounded, Infeasible) as e:
+        return {'time': time.perf_counter()-start, 'iterations': None}, type(e).__name__
+    z = s.solution()['z']
+    if programme.get('sense') == 'min':
+        z = -z
+    # engine='mixed': the float64 pivots plus the exact repair pivots
+    iterations = s.iterations+(s.float_iterations or 0)
+    return {'time': time.perf_counter()-start, 'iterations': iterations}, z
+
+
+def peak_memory(programme, engine, pivot_rule):
+    tracemalloc.start()
+    try:
+        run(programme, engine, pivot_rule)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def agree(z, ref):
+    if isinstance(z, str) or isinstance(ref, str):
+        return z == ref
+    return abs(float(z)-float(ref)) <= 1e-6*max(1, abs(float(ref)))
+
+
+def bench(size='small', engines=ENGINES, seed=0, repeat=1, memory=True, log=print):
+    results = []
+    for family, name, programme in instances(size, seed):
+        rule = RULES.get(name, 'dantzig')
+        ref = None
+        m, n = len(programme['contraintes']), len(programme['function'])
+        for engine in engines:
+            # best of `repeat` timed runs, memory traced in a separate run
+            # since tracemalloc slows the solve down
+            runs = [run(programme, engine, rule) for _ in range(repeat)]
+            res, z = min(runs, key=lambda r: r[0]['time'])
+            if ref is None:
+                ref = z
+            res.update({
+                'family': family,
+                'instance': name,
+                'm': m,
+                'n': n,
+                'engine': engine,
+                'pivot_rule': rule,
+                'z': z if isinstance(z, str) else float(z),
+                'agree': agree(z, ref),
+                'peak_bytes': peak_memory(programme, engine, rule) if memory else None,
+            })
+            results.append(res)
+            if log:
+                log(f"{name:22} {engine:9} {res['time']:9.4f}s {res['iterations'] or 0:6d}it "
+                    f"{(res['peak_bytes'] or 0)/1024:9.1f}KiB {'' if res['agree'] else 'DISAGREE'}")
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare(old, new):
+    """Print time ratios new/old per (instance, engine)."""
+    before = {(r['instance'], r['engine']): r for r in old['results']}
+    for r in new['results']:
+        o = before.get((r['instance'], r['engine']))
+        if o and o['time']:
+            flag = ' SLOWER' if r['time'] > 1.2*o['time'] else ''
+            print(f"{r['instance']:22} {r['engine']:9} x{r['time']/o['time']:.2f}{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the simplex engines.')
+    parser.add_argument('--size', choices=SIZES, default='small')
+    parser.add_argument('--engines', default=','.join(ENGINES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--no-memory', action='store_true')
+    parser.add_argument('--out', help='write the results as JSON')
+    parser.add_argument('--compare', help='JSON file of an earlier run')
+    args = parser.parse_args()
+    results = bench(args.size, args.engines.split(','), args.seed, args.repeat, not args.no_memory)
+    report = {**metadata(), 'size': args.size, 'seed': args.seed, 'results': results}
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
@@ -0,0 +1,185 @@
+import copy
+import heapq
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from solver import SimplexSolver, Infeasible
+
+# Branch and bound for integer programmes on top of SimplexSolver.
+# Every node is a solved SimplexSolver. A child copies its parent, adds the
+# branching row x_j <= floor(v) or -x_j <= -ceil(v) with add_constraint and
+# reoptimize()s, so it starts from the parent's optimal basis and only needs
+# a few dual simplex pivots.
+
+
+def _evaluate(node):
+    """Solve one child: (parent solver, branching row) -> solver or None if infeasible."""
+    solver, (coeffs, rhs) = node
+    s = copy.deepcopy(solver)
+    s.add_constraint(coeffs, rhs)
+    try:
+        s.reoptimize()
+    except Infeasible:
+        return None
+    return s
+
+
+class BranchAndBound:
+    """Maximizes the programme with the variables of `integer` (0-based
+    indices, all of them by default) restricted to integer values.
+
+    Open nodes are taken `batch` at a time, best bound first (select='best')
+    or deepest first (select='depth'), and evaluated on a pool of `workers`
+    processes. Results of a round are merged in the order the nodes were
+    taken, so the incumbent, the node count and the tree explored only depend
+    on `seed` (which breaks ties between equally fractional variables) and
+    `batch`, never on the number of workers or their timing.
+    """
+
+    def __init__(self, programme, integer=None, engine='fraction', pivot_rule='dantzig', select='best',
+                 workers=1, batch=8, seed=0, max_nodes=None):
+        if select not in ('best', 'depth'):
+            raise ValueError(f"unknown node selection {select!r}")
+        n = len(programme['function'])
+        self.integer = sorted(range(n) if integer is None else integer)
+        self.select = select
+        self.batch = batch
+        self.seed = seed
+        self.max_nodes = max_nodes
+        self.incumbent = None
+        self.nodes = 0
+        self.log = []
+        start = time.perf_counter()
+        root = SimplexSolver(programme, engine=engine, history=False, pivot_rule=pivot_rule)
+        self.tol = 0 if root.tableau.tol == 0 else 1e-6
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                self.search(root, pool.map, start)
+        else:
+            self.search(root, map, start)
+        self.time = time.perf_counter()-start
+        self.status = 'node limit' if self.open else 'optimal' if self.incumbent else 'infeasible'
+
+    def z(self, solver):
+        return solver.solution()['z']
+
+    def branch(self, solver):
+        """Most fractional integer variable as (j, value), None if all are integral."""
+        x = solver.solution()['x']
+        frac = {j: abs(x[j]-round(x[j])) for j in self.integer}
+        worst = max(frac.values(), default=0)
+        if worst <= self.tol:
+            return None
+        ties = [j for j in self.integer if frac[j] == worst]
+        j = random.Random(self.seed*1000003+self.nodes).choice(ties)
+        return j, x[j]
+
+    def search(self, root, evaluate, start):
+        # open holds (key, id, bound, parent, row): best bound pops the highest
+        # bound, depth first the most recent node
+        self.open = []
+        self.counter = 0
+        self.bound = self.z(root)
+        self.nodes = 1
+        self.accept(root)
+        while self.open:
+            if self.max_nodes is not None and self.nodes >= self.max_nodes:
+                break
+            taken = []
+            while self.open and len(taken) < self.batch:
+                _, _, bound, parent, row = heapq.heappop(self.open)
+                if not self.pruned(bound):
+                    taken.append((parent, row))
+            for child in evaluate(_evaluate, taken):
+                self.nodes += 1
+                if child is not None:
+                    self.accept(child)
+            open_bounds = [node[2] for node in self.open]
+            if self.incumbent is not None:
+                open_bounds.append(self.z(self.incumbent))
+            self.bound = max(open_bounds, default=self.bound)
+            self.log.append({
+                'time': time.perf_counter()-start,
+                'nodes': self.nodes,
+                'incumbent': None if self.incumbent is None else self.z(self.incumbent),
+                'bound': self.bound,
+                'gap': self.gap(),
+            })
+
+    def accept(self, solver):
+        z = self.z(solver)
+        if self.pruned(z):
+            return
+        branch = self.branch(solver)
+        if branch is None:
+            self.incumbent = solver
+            return
+        j, v = branch
+        n = len(solver.programme['function'])
+        down = [0]*n
+        down[j] = 1
+        up = [0]*n
+        up[j] = -1
+        # depth first dives into the side v rounds to first
+        children = [(up, -math.ceil(v)), (down, math.floor(v))]
+        if v-math.floor(v) >= 0.5:
+            children.reverse()
+        for row in children:
+            self.counter += 1
+            key = (-z, self.counter) if self.select == 'best' else (-self.counter,)
+            heapq.heappush(self.open, (key, self.counter, z, solver, row))
+
+    def pruned(self, bound):
+        if self.incumbent is None:
+            return False
+        best = self.z(self.incumbent)
+        return bound <= best+self.tol*max(1, abs(best))
+
+    def gap(self):
+        if self.incumbent is None:
+            return None
+        best = self.z(self.incumbent)
+        return float(self.bound-best)/max(1, abs(float(best)))
+
+    def solution(self):
+        if self.incumbent is None:
+            raise Infeasible("no integer solution found")
+        return self.incumbent.solution()
+
+    def stats(self):
+        return {
+            'status': self.status,
+            'select': self.select,
+            'nodes': self.nodes,
+            'time': self.time,
+            'nodes_per_second': self.nodes/self.time if self.time else 0,
+            'gap': self.gap(),
+        }
+
+
+if __name__ == "__main__":
+    # random multi-dimensional knapsacks: nodes/s and gap over time for both
+    # node selections and growing pools, every run must end on the same z
+    rd = random.Random(0)
+    for m, n in [(5, 15), (6, 20)]:
+        A = [[rd.randint(1, 20) for _ in range(n)] for _ in range(m)]
+        programme = {
+            "function": [rd.randint(5, 40) for _ in range(n)],
+            "contraintes": [[A[i], sum(A[i])//3] for i in range(m)],
+            "bounds": [[0, 3]]*n,
+        }
+        ref = None
+        for select in ['best', 'depth']:
+            for workers in [1, 2, 4]:
+                bb = BranchAndBound(programme, select=select, workers=workers)
+                s = bb.stats()
+                z = bb.solution()['z']
+                ref = z if ref is None else ref
+                print(f"m={m} n={n} {select:5} workers={workers} nodes={s['nodes']} "
+                      f"{s['nodes_per_second']:.0f} nodes/s z={z}{'' if z == ref else ' MISMATCH'}")
+            print("  gap over time: "+" ".join(f"{e['time']:.2f}s:{e['gap']:.3f}" for e in bb.log[::max(1, len(bb.log)//8)]
+                                              if e['gap'] is not None))
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zlib
+from fractions import Fraction
+from solver import SimplexSolver, Unbounded, Infeasible, dense_row
+from history import History
+
+try:
+    import fcntl
+except ImportError:  # no flock on Windows, eviction then runs unlocked
+    fcntl = None
+
+# On-disk cache of SimplexSolver results, keyed by the sha256 of a canonical
+# form of the programme and the solver options. An entry is one zlib
+# compressed JSON file holding the final table (or the Unbounded/Infeasible
+# outcome) and optionally the pivot log and checkpoints of the history.
+# Files are written to a temporary name and os.replace()d, so readers never
+# see a partial entry. The running size of the cache is kept in the file
+# .size, updated by every put() under an flock of the cache directory; only
+# when it passes max_bytes (or is missing) is the directory walked again:
+# temporary files older than STALE seconds, left by crashed writers, are
+# removed, then entries least recently used first (by mtime) until the
+# cache is down to LOW_WATER*max_bytes, and .size is rewritten with the
+# real total.
+
+OPTIONS = ('presolve', 'crash', 'basis')
+STALE = 3600
+LOW_WATER = 0.9
+
+
+def _number(v):
+    f = Fraction(v)
+    return f'{f.numerator}/{f.denominator}'
+
+
+def _default(o):
+    if isinstance(o, Fraction):
+        return {'/': [o.numerator, o.denominator]}
+    if hasattr(o, 'item'):
+        return o.item()
+    raise TypeError(f"cannot store {type(o).__name__}")
+
+
+def _hook(d):
+    if '/' in d:
+        return Fraction(*d['/'])
+    return d
+
+
+class SolutionCache:
+    """Cache of solved programmes in directory `path`.
+
+    solve() returns a SimplexSolver, either solved now (and stored) or
+    rebuilt from the cache without pivoting. With history=False only the
+    final table is stored and restored.
+    """
+
+    def __init__(self, path=None, max_bytes=256*2**20):
+        self.path = os.path.expanduser(path or os.environ.get('SIMPLEX_CACHE', '~/.cache/simplex'))
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.path, exist_ok=True)
+
+    def key(self, programme, engine='fraction', pivot_rule='dantzig', **options):
+        n = len(programme['function'])
+        canonical = {
+            'function': [_number(v) for v in programme['function']],
+            'contraintes': [[[_number(v) for v in dense_row(a, n)], _number(b)] for a, b in programme['contraintes']],
+            'bounds': [[_number(lo), None if hi is None else _number(hi)] for lo, hi in programme.get('bounds') or []],
+            'variables': programme.get('variables'),
+            'rows': programme.get('rows'),
+            'engine': engine,
+            'pivot_rule': pivot_rule,
+            **{k: options.get(k) for k in OPTIONS},
+        }
+        return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], key+'.json.z')
+
+    def get(self, key):
+        """The stored entry as a dict, or None."""
+        file = self._file(key)
+        try:
+            with open(file, 'rb') as f:
+                entry = json.loads(zlib.decompress(f.read()), object_hook=_hook)
+            os.utime(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error):
+            # unreadable or corrupted entry: drop it
+            try:
+                os.remove(file)
+            except OSError:
+                pass
+            return None
+        return entry
+
+    def put(self, key, entry):
+        file = self._file(key)
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        data = zlib.compress(json.dumps(entry, default=_default, separators=(',', ':')).encode())
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(file), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            try:
+                old = os.stat(file).st_size
+            except FileNotFoundError:
+                old = 0
+            os.replace(tmp, file)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self.account(len(data)-old)
+
+    def entries(self):
+        """(mtime, size, file) of every entry and of every stale temporary file."""
+        res = []
+        now = time.time()
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                if name.endswith(('.json.z', '.tmp')):
+                    file = os.path.join(root, name)
+                    try:
+                        st = os.stat(file)
+                    except FileNotFoundError:
+                        continue
+                    if name.endswith('.tmp') and now-st.st_mtime < STALE:
+                        # still being written
+                        continue
+                    res.append((st.st_mtime, st.st_size, file))
+        return res
+
+    def _locked(self):
+        lock = open(os.path.join(self.path, '.lock'), 'a')
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def account(self, delta):
+        """Add delta bytes to the running size, evicting once it passes max_bytes."""
+        size = os.path.join(self.path, '.size')
+        with self._locked():
+            try:
+                with open(size) as f:
+                    total = int(f.read())+delta
+            except (OSError, ValueError):
+                total = None
+            if total is None or total > self.max_bytes:
+                total = self.evict_locked()
+            with open(size, 'w') as f:
+                f.write(str(total))
+
+    def evict(self):
+        with self._locked():
+            total = self.evict_locked()
+            with open(os.path.join(self.path, '.size'), 'w') as f:
+                f.write(str(total))
+
+    def evict_locked(self):
+        """Walk the cache (the lock held): drop stale temporary files, then
+        entries by mtime down to LOW_WATER*max_bytes. Returns the new total."""
+        entries = sorted(self.entries(), key=lambda e: (not e[2].endswith('.tmp'), e[0]))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            # only the stale temporary files go
+            entries = [e for e in entries if e[2].endswith('.tmp')]
+        for _, size, file in entries:
+            if total <= LOW_WATER*self.max_bytes and not file.endswith('.tmp'):
+                break
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+    def solve(self, programme, engine='fraction', pivot_rule='dantzig', history=True, **options):
+        key = self.key(programme, engine, pivot_rule, **options)
+        entry = self.get(key)
+        if entry is not None and (entry.get('log') is not None or not history or entry['status'] != 'optimal'):
+            self.hits += 1
+            return self.restore(entry, programme, engine, pivot_rule, history, options)
+        self.misses += 1
+        try:
+            solver = SimplexSolver(programme, engine=engine, history=history, pivot_rule=pivot_rule, **options)
+        except (Unbounded, Infeasible) as e:
+            self.put(key, {'status': type(e).__name__, 'error': str(e)})
+            raise
+        self.put(key, self.entry(solver))
+        return solver
+
+    def entry(self, solver):
+        entry = {
+            'status': 'optimal',
+            'iterations': solver.iterations,
+            'time': solver.time,
+            'flipped': sorted(solver.flipped),
+            'final': solver.tables[-1]['table'],
+            'log': None,
+        }
+        if isinstance(solver.tables, History):
+            h = solver.tables
+            entry['log'] = h.log
+            entry['checkpoints'] = [[i, t] for i, t in h.checkpoints.items() if i != len(h)-1]
+            entry['every'] = h.every
+        return entry
+
+    def restore(self, entry, programme, engine, pivot_rule, history, options):
+        if entry['status'] != 'optimal':
+            raise (Unbounded if entry['status'] == 'Unbounded' else Infeasible)(entry['error'])
+        solver = SimplexSolver(programme, engine=engine, history=history, solve=False, pivot_rule=pivot_rule, **options)
+        solver.upper = {j+1: hi-lo for j, (lo, hi) in enumerate(solver.bounds()) if hi is not None}
+        solver.flipped = set(entry['flipped'])
+        solver.iterations = entry['iterations']
+        solver.time = entry['time']
+        final = entry['final']
+        solver.tableau = solver.make_tableau(final)
+        if history and entry['log'] is not None:
+            checkpoints = dict(entry['checkpoints'])
+            log = entry['log']
+            checkpoints[len(log)-1] = final
+            steps = ({'piv': piv, 'flip': flips, 'table': checkpoints.get(i)} for i, (piv, flips) in enumerate(log))
+            solver.tables = History(solver, steps, entry['every'])
+        else:
+            solver.tables = [{'piv': None, 'table': final}]
+        return solver
+
+    def stats(self):
+        entries = self.entries()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': sum(1 for _, _, file in entries if not file.endswith('.tmp')),
+            'bytes': sum(size for _, size, _ in entries),
+        }
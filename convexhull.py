@@ -1,15 +1,9 @@
 import math
+from geometry import orient
 
 def orientation(p, q, r):
-    val = (q[1] - p[1]) * (r[0] - q[0]) - \
-          (q[0] - p[0]) * (r[1] - q[1])
-
-    if val == 0:
-        return 0
-    elif val > 0:
-        return 1
-    else:
-        return 2
+    # 0: collinear, 1: clockwise, 2: counterclockwise
+    return (0, 2, 1)[orient(p, q, r)]
 
 def dist_sq(p1, p2):
     return (p1[0] - p2[0])**2 + (p1[1] - p2[1])**2
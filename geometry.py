@@ -0,0 +1,136 @@
+from fractions import Fraction
+
+# Geometric predicates shared by convexhull.py and polygon.py.
+# Every predicate returns the sign (-1, 0 or 1) of a polynomial in its
+# inputs. With float inputs it is first evaluated in floats along with a bound
+# on the rounding error of that evaluation; only when the value is within the
+# bound (so its sign is uncertain) is it evaluated again exactly with
+# Fractions. Int inputs are exact as they are, other numbers (Fractions) go
+# straight to the exact path.
+#
+# A line (a, b, c) is a*x + b*y = c.
+
+# relative error bound of a sum of products of at most three floats, with
+# margin: each product, each addition and each int to float conversion
+# rounds by at most 2**-53
+ERR = 16*2.0**-53
+# error allowed on a coordinate of intersection(), relative to 1+|coordinate|
+POINT_ERR = 2.0**-40
+
+_INT = {int}
+_NATIVE = {int, float}
+
+
+def _sign(v):
+    return (v > 0) - (v < 0)
+
+
+def _filtered(f, values):
+    """sign(f(*values)), f returning (value, magnitude) where magnitude bounds
+    the sum of the absolute values of its terms."""
+    kinds = set(map(type, values))
+    if kinds <= _INT:
+        return _sign(f(*values)[0])
+    if kinds <= _NATIVE or all(isinstance(v, (int, float)) for v in values):
+        v, mag = f(*values)
+        if abs(v) > ERR*mag:
+            return _sign(v)
+    return _sign(f(*map(Fraction, values))[0])
+
+
+def _orient(px, py, qx, qy, rx, ry):
+    l = (qx-px)*(ry-py)
+    r = (qy-py)*(rx-px)
+    return l-r, abs(l)+abs(r)
+
+
+def orient(p, q, r):
+    """1 if p, q, r turn counterclockwise, -1 if clockwise, 0 if collinear."""
+    # ERR also covers the rounding of the differences (Shewchuk's bound for
+    # this expression is 3*2**-53)
+    return _filtered(_orient, (*p, *q, *r))
+
+
+def _cross(a1, b1, a2, b2):
+    l = a1*b2
+    r = a2*b1
+    return l-r, abs(l)+abs(r)
+
+
+def cross(l1, l2):
+    """Sign of a1*b2 - a2*b1: 0 when the lines are parallel, 1 when l2's
+    normal is counterclockwise from l1's."""
+    return _filtered(_cross, (l1[0], l1[1], l2[0], l2[1]))
+
+
+def _side(ah, bh, ch, a1, b1, c1, a2, b2, c2):
+    t1, t2 = ah*c1*b2, ah*c2*b1
+    t3, t4 = bh*a1*c2, bh*a2*c1
+    t5, t6 = ch*a1*b2, ch*a2*b1
+    return t1-t2+t3-t4-t5+t6, abs(t1)+abs(t2)+abs(t3)+abs(t4)+abs(t5)+abs(t6)
+
+
+def side(h, l1, l2):
+    """Sign of a*x + b*y - c of line h at the intersection point of the
+    (non parallel) lines l1 and l2."""
+    return _filtered(_side, (*h, *l1, *l2))*cross(l1, l2)
+
+
+def intersection(l1, l2):
+    """Intersection point of two lines as floats, None if they are parallel."""
+    if cross(l1, l2) == 0:
+        return None
+    a1, b1, c1 = l1
+    a2, b2, c2 = l2
+    values = (a1, b1, c1, a2, b2, c2)
+    kinds = set(map(type, values))
+    if kinds <= _NATIVE:
+        det, dmag = _cross(a1, b1, a2, b2)
+        nx, xmag = _cross(c1, b1, c2, b2)
+        ny, ymag = _cross(a1, c1, a2, c2)
+        if kinds <= _INT:
+            # exact products, int / int rounds correctly
+            return (nx/det, ny/det)
+        if det:
+            x, y = nx/det, ny/det
+            # near parallel lines make det, and so the point, inaccurate long
+            # before its sign is in doubt: keep the float point only when its
+            # error bound is below POINT_ERR, otherwise solve exactly
+            if (ERR*(xmag+abs(x)*dmag) <= POINT_ERR*(1+abs(x))*abs(det)
+                    and ERR*(ymag+abs(y)*dmag) <= POINT_ERR*(1+abs(y))*abs(det)):
+                return (x, y)
+    a1, b1, c1, a2, b2, c2 = map(Fraction, values)
+    det = a1*b2 - a2*b1
+    return (float((c1*b2 - c2*b1)/det), float((a1*c2 - a2*c1)/det))
+
+
+def coincident(l1, l2):
+    """True when l1 and l2 are the same line."""
+    return (cross(l1, l2) == 0
+            and _filtered(_cross, (l1[0], l1[2], l2[0], l2[2])) == 0
+            and _filtered(_cross, (l1[1], l1[2], l2[1], l2[2])) == 0)
+
+
+def offset(l1, l2):
+    """For parallel lines with normals pointing the same way: sign of
+    c1/|n1| - c2/|n2| (-1 when a*x + b*y <= c is tighter for l1)."""
+    k = 0 if l1[0] else 1
+    return _sign(Fraction(l1[2])*Fraction(l2[k]) - Fraction(l2[2])*Fraction(l1[k]))*_sign(l1[k])
+
+
+if __name__ == "__main__":
+    # filtered predicates vs always-exact evaluation
+    import random, time
+    rd = random.Random(0)
+    pts = [(rd.uniform(-100, 100), rd.uniform(-100, 100)) for _ in range(30000)]
+    # nearly collinear triples: the float path cannot decide those
+    near = [((0.5, 0.5), (12.0, 12.0), (24.0+i*1e-15, 24.0)) for i in range(-5, 6)]
+    start = time.perf_counter()
+    fast = [orient(pts[i], pts[i+1], pts[i+2]) for i in range(len(pts)-2)]
+    t_filtered = time.perf_counter()-start
+    start = time.perf_counter()
+    exact = [_sign(_orient(*map(Fraction, (*pts[i], *pts[i+1], *pts[i+2])))[0]) for i in range(len(pts)-2)]
+    t_exact = time.perf_counter()-start
+    assert fast == exact
+    print(f"orient: filtered={t_filtered*1e6/len(fast):.2f}us exact={t_exact*1e6/len(fast):.2f}us per call")
+    print("near collinear:", [orient(*t) for t in near])
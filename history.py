@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from collections.abc import Sequence
+
+# Lazy history of a SimplexSolver run (solver.tables).
+# Only the pivots (and bound flips) of every step are logged; full tables are
+# kept at checkpoints, every `every` steps, wherever the solver rebuilt its
+# tableau (phase change, repricing) and for the final step. Any other table is
+# rebuilt by replaying the log from the nearest checkpoint before it.
+
+
+class History(Sequence):
+    """Sequence of {'piv', 'table'[, 'flip']} steps, as SimplexSolver.steps yields them.
+
+    `every` trades memory for replay work: every=1 stores every table, larger
+    values store m*n cells every `every` pivots and replay at most every-1
+    pivots per lookup. The last `cache` rebuilt tables are kept, so walking
+    the steps in order (as the Simplex scene does) replays one pivot each.
+    """
+
+    def __init__(self, solver, steps, every=10, cache=2):
+        self.solver = solver
+        self.every = every
+        self.log = []
+        self.checkpoints = {}
+        for i, step in enumerate(steps):
+            self.log.append((step['piv'], step.get('flip', [])))
+            if step['table'] is not None:
+                self.checkpoints[i] = step['table']
+        self.cache = OrderedDict()
+        self.cache_size = cache
+        self._replay = None
+
+    def __len__(self):
+        return len(self.log)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("history index out of range")
+        piv, flips = self.log[i]
+        step = {'piv': piv, 'table': self.table(i)}
+        if flips:
+            step['flip'] = flips
+        return step
+
+    def table(self, i):
+        if i in self.checkpoints:
+            return self.checkpoints[i]
+        if i in self.cache:
+            self.cache.move_to_end(i)
+            return self.cache[i]
+        start = max(k for k in self.checkpoints if k < i)
+        if self._replay and start <= self._replay[0] < i:
+            start, tableau = self._replay
+        else:
+            tableau = self.solver.make_tableau(self.checkpoints[start])
+        upper = self.solver.upper
+        for piv, flips in self.log[start:i]:
+            if piv:
+                tableau.pivot(*piv)
+            for col in flips:
+                tableau.flip(col, upper[col])
+        self._replay = (i, tableau)
+        table = tableau.snapshot()
+        self.cache[i] = table
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return table
+
+    def memory(self):
+        """Number of table cells held (checkpoints and cache)."""
+        tables = list(self.checkpoints.values())+list(self.cache.values())
+        return sum(len(row) for t in tables for row in t)
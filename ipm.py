@@ -0,0 +1,342 @@
+import time
+import numpy as np
+from solver import SimplexSolver, Unbounded, Infeasible
+
+try:
+    import scipy.sparse as sparse
+    from scipy.linalg import cho_factor, cho_solve
+    from scipy.linalg.blas import dsyrk
+    from scipy.sparse.linalg import splu
+except ImportError:  # dense numpy factorizations only
+    sparse = None
+try:
+    from sksparse.cholmod import cholesky as cholmod
+except ImportError:
+    cholmod = None
+
+# Primal-dual interior point method (Mehrotra predictor-corrector) for the
+# programmes SimplexSolver takes. The programme max f.x, a.x <= b, x >= 0 is
+# solved in standard form min -f.x, Ax + e = b, (x,e) >= 0.
+# The slack columns are never stored: the normal matrix is A D_x A^T + D_e.
+# With scipy, a programme of density at most SPARSE_DENSITY keeps A sparse
+# and factorizes that matrix with CHOLMOD (scikit-sparse) or SuperLU; when
+# the first factor holds more than DENSE_FILL*m^2 nonzeros the fill-in made
+# it dense anyway, and the later iterations factorize a dense matrix.
+
+SPARSE_DENSITY = 0.1
+DENSE_FILL = 0.1
+
+
+class NotConverged(Exception):
+    pass
+
+
+def _issparse(A):
+    return sparse is not None and sparse.issparse(A)
+
+
+def _factorize(M):
+    """(solve, factor nonzeros), solve(r) = M^-1 r for the symmetric positive
+    definite normal matrix."""
+    if _issparse(M):
+        if cholmod is not None:
+            factor = cholmod(M)
+            return factor, 2*factor.L().nnz
+        factor = splu(M, permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0,
+                      options={'SymmetricMode': True})
+        return factor.solve, factor.L.nnz+factor.U.nnz
+    return _dense_factorize(M), M.size
+
+
+def _dense_factorize(M):
+    if sparse is not None:
+        # (upper triangle from normal())
+        factor = cho_factor(M, lower=False, overwrite_a=True)
+        return lambda r: cho_solve(factor, r)
+    # numpy has no triangular solve, one LU solve is cheaper than two
+    return lambda r: np.linalg.solve(M, r)
+
+
+def _step(v, dv):
+    neg = dv < 0
+    if not neg.any():
+        return 1.0
+    return min(1.0, float(np.min(-v[neg]/dv[neg])))
+
+
+class InteriorPointSolver:
+    """Solves with the interior point method, then optionally crosses over.
+
+    With crossover=True the m columns carrying the largest primal values (and
+    independent) are used as the starting basis of a SimplexSolver, which
+    repairs and finishes it with a few pivots. The result then has the same
+    solution()/tables/tableau as a simplex solve.
+
+    Infeasible and Unbounded are raised from certificates found on the
+    iterates. Without crossover, running out of iterations raises
+    NotConverged; with it the simplex finishes from the last iterate.
+    """
+
+    def __init__(self, programme, tol=1e-8, max_iter=200, crossover=True, engine='float', history=False):
+        self.programme = programme
+        f = programme['function']
+        sc = programme['contraintes']
+        m, n = len(sc), len(f)
+        self.A = self.matrix(sc, n)
+        self.m, self.n = m, n
+        self.dense_normal = not _issparse(self.A)
+        self.b = np.array([float(line[1]) for line in sc])
+        self.c = -np.concatenate([np.array(f, dtype=np.float64), np.zeros(m)])
+        self.tol = tol
+        self.max_iter = max_iter
+        self.iterations = 0
+        self.converged = False
+        start = time.perf_counter()
+        self.x, self.y, self.s = self.solve()
+        self.time = time.perf_counter()-start
+        if not self.converged and not crossover:
+            raise NotConverged(f"no optimum within {max_iter} interior point iterations")
+        self.solver = None
+        if crossover:
+            self.solver = SimplexSolver(programme, engine=engine, history=history, basis=self.crossover_basis())
+            self.time = time.perf_counter()-start
+
+    @staticmethod
+    def matrix(rows, n):
+        """A (without slacks) as a scipy CSR matrix when it is sparse enough,
+        else as a dense array."""
+        m = len(rows)
+        if not any(isinstance(row, dict) for row, _ in rows):
+            A = np.array([row for row, _ in rows], dtype=np.float64).reshape(m, n)
+            if sparse is not None and np.count_nonzero(A) <= SPARSE_DENSITY*m*n:
+                return sparse.csr_matrix(A)
+            return A
+        i, j, v = [], [], []
+        for k, (row, _) in enumerate(rows):
+            items = row.items() if isinstance(row, dict) else enumerate(row)
+            for col, value in items:
+                if value:
+                    i.append(k)
+                    j.append(col)
+                    v.append(float(value))
+        if sparse is not None and len(v) <= SPARSE_DENSITY*m*n:
+            return sparse.csr_matrix((v, (i, j)), shape=(m, n))
+        A = np.zeros((m, n))
+        A[i, j] = v
+        return A
+
+    def times(self, v):
+        """[A I] v"""
+        return self.A @ v[:self.n] + v[self.n:]
+
+    def rtimes(self, y):
+        """[A I]^T y"""
+        return np.concatenate([self.A.T @ y, y])
+
+    def normal(self, d, shift=0):
+        """[A I] diag(d) [A I]^T = A D_x A^T + D_e, plus shift on the diagonal"""
+        A, n = self.A, self.n
+        if _issparse(A):
+            M = A @ sparse.diags(d[:n]) @ A.T
+            if not self.dense_normal:
+                return (M + sparse.diags(d[n:]+shift)).tocsc()
+            M = M.toarray()
+        elif sparse is not None:
+            # symmetric rank-k update, only the upper triangle is computed
+            M = dsyrk(1.0, A*np.sqrt(d[:n]))
+        else:
+            M = (A*d[:n]) @ A.T
+        M[np.diag_indices(self.m)] += d[n:]+shift
+        return M
+
+    def factorize(self, M):
+        solve, nnz = _factorize(M)
+        if nnz > DENSE_FILL*self.m**2:
+            self.dense_normal = True
+        return solve
+
+    def solve(self):
+        b, c = self.b, self.c
+        n = self.n+self.m
+        # Mehrotra's starting point
+        solve = self.factorize(self.normal(np.ones(n)))
+        x = self.rtimes(solve(b))
+        y = solve(self.times(c))
+        s = c - self.rtimes(y)
+        x += max(-1.5*x.min(), 0)
+        s += max(-1.5*s.min(), 0)
+        x += 0.5*(x @ s)/max(s.sum(), 1e-12)
+        s += 0.5*(x @ s)/max(x.sum(), 1e-12)
+        x = np.maximum(x, 1e-8)
+        s = np.maximum(s, 1e-8)
+        nb, nc = 1+np.linalg.norm(b), 1+np.linalg.norm(c)
+        for k in range(self.max_iter):
+            rp = b - self.times(x)
+            rd = c - self.rtimes(y) - s
+            mu = (x @ s)/n
+            gap = abs(c @ x - b @ y)/(1+abs(c @ x))
+            if np.linalg.norm(rp)/nb < self.tol and np.linalg.norm(rd)/nc < self.tol and gap < self.tol:
+                self.iterations = k
+                self.converged = True
+                return x, y, s
+            self.certificates(x, y)
+            d = x/s
+            solve = self.factorize(self.normal(d, 1e-14*d.max()))
+
+            def newton(rc):
+                r = (rc - x*rd)/s
+                dy = solve(rp - self.times(r))
+                ATdy = self.rtimes(dy)
+                dx = r + d*ATdy
+                ds = rd - ATdy
+                return dx, dy, ds
+
+            # predictor
+            dx, dy, ds = newton(-x*s)
+            ap, ad = _step(x, dx), _step(s, ds)
+            mu_aff = ((x+ap*dx) @ (s+ad*ds))/n
+            sigma = (mu_aff/mu)**3
+            # corrector
+            dx, dy, ds = newton(-x*s - dx*ds + sigma*mu)
+            ap, ad = 0.99*_step(x, dx), 0.99*_step(s, ds)
+            x = x+ap*dx
+            y = y+ad*dy
+            s = s+ad*ds
+            if not np.isfinite(x).all() or x.max() > 1e12/self.tol or np.abs(y).max() > 1e12/self.tol:
+                # diverging without a certificate: give up on the last iterate
+                self.iterations = k+1
+                return x-ap*dx, y-ad*dy, s-ad*ds
+        self.certificates(x, y)
+        self.iterations = self.max_iter
+        return x, y, s
+
+    def certificates(self, x, y):
+        """Raise Infeasible / Unbounded when the iterates hold a certificate.
+
+        A y with A^T y <= 0 and b.y > 0 proves Ax = b, x >= 0 infeasible
+        (Farkas); an x >= 0 with Ax = 0 and c.x < 0 is a ray along which the
+        objective is unbounded from a feasible x. On a diverging iterate the
+        part that stays bounded (c - s for A^T y, b - rp for Ax) vanishes next
+        to b.y or -c.x.
+        """
+        b, c = self.b, self.c
+        by = b @ y
+        if by > 0 and np.max(self.rtimes(y), initial=0) <= self.tol*by:
+            raise Infeasible("interior point iterates hold a Farkas certificate (A^T y <= 0, b.y > 0)")
+        # the ray only matters once x is (nearly) feasible
+        cx = c @ x
+        Ax = self.times(x)
+        rp = np.linalg.norm(b - Ax)/(1+np.linalg.norm(b))
+        if cx < 0 and rp < np.sqrt(self.tol) and np.linalg.norm(Ax) <= np.sqrt(self.tol)*-cx:
+            raise Unbounded("interior point iterates hold an unbounded ray (Ax = 0, c.x < 0)")
+
+    def crossover_basis(self):
+        """Independent columns of [A I] taken by decreasing x_j/s_j
+        (Gram-Schmidt into a preallocated orthonormal Q)."""
+        m, n = self.m, self.n
+        A = self.A.tocsc() if _issparse(self.A) else self.A
+        order = np.argsort(-self.x/np.maximum(self.s, 1e-300))
+        Q = np.zeros((m, m))
+        basis = []
+        for j in order.tolist():
+            k = len(basis)
+            if j < n:
+                a = A[:, j].toarray()[:, 0] if _issparse(A) else A[:, j]
+                v = a - Q[:, :k] @ (Q[:, :k].T @ a)
+            else:
+                a = np.zeros(m)
+                a[j-n] = 1
+                v = a - Q[:, :k] @ Q[j-n, :k]
+            norm = np.linalg.norm(v)
+            if norm > 1e-9*max(1, np.linalg.norm(a)):
+                Q[:, k] = v/norm
+                basis.append(j+1)
+                if k+1 == m:
+                    break
+        return basis
+
+    @property
+    def tables(self):
+        return self.solver.tables if self.solver else []
+
+    @property
+    def tableau(self):
+        return self.solver.tableau if self.solver else None
+
+    def solution(self):
+        if self.solver:
+            return self.solver.solution()
+        n = len(self.programme['function'])
+        return {'x': self.x[:n].tolist(), 'z': float(-self.c @ self.x)}
+
+    def stats(self):
+        return {
+            'engine': 'ipm',
+            'iterations': self.iterations,
+            'converged': self.converged,
+            'crossover_pivots': self.solver.iterations if self.solver else 0,
+            'time': self.time,
+        }
+
+
+if __name__ == "__main__":
+    # certificates on small programmes the iterates used to get wrong
+    for programme, error in [
+        ({"function": [1], "contraintes": [[[1], -1]]}, Infeasible),
+        ({"function": [1, 1], "contraintes": [[[1, 1], 1], [[-1, -1], -3]]}, Infeasible),
+        ({"function": [1, 1], "contraintes": [[[1, -1], 1]]}, Unbounded),
+    ]:
+        for crossover in [True, False]:
+            try:
+                InteriorPointSolver(programme, crossover=crossover)
+            except error:
+                continue
+            raise AssertionError(f"{programme} should raise {error.__name__}")
+    assert abs(InteriorPointSolver({"function": [1, 2], "contraintes": [[[1, 1], 4]]}, crossover=False).solution()['z']-8) < 1e-6
+
+    # interior point (+ crossover) against the float and revised simplex
+    # engines on growing random dense programmes
+    rng = np.random.default_rng(0)
+    for m, n in [(25, 50), (50, 100), (100, 200), (200, 400), (500, 1000)]:
+        A = rng.integers(1, 20, (m, n))
+        programme = {
+            "function": rng.integers(1, 30, n).tolist(),
+            "contraintes": [[A[i].tolist(), int(rng.integers(100, 1000))] for i in range(m)],
+        }
+        line = [f"m={m} n={n}"]
+        ref = None
+        for name, run in [
+            ('ipm', lambda: InteriorPointSolver(programme, crossover=False)),
+            ('ipm+crossover', lambda: InteriorPointSolver(programme)),
+            ('float', lambda: SimplexSolver(programme, engine='float', history=False)),
+            ('revised', lambda: SimplexSolver(programme, engine='revised', history=False)),
+        ]:
+            t = time.perf_counter()
+            s = run()
+            z = float(s.solution()['z'])
+            ref = z if ref is None else ref
+            line.append(f"{name}={time.perf_counter()-t:.3f}s({s.stats()['iterations']}it{'' if abs(z-ref) < 1e-6*abs(ref) else ' MISMATCH'})")
+        print(" ".join(line))
+
+    # staircase programmes (each period's columns also enter the next
+    # period's rows) with tens of thousands of rows: only the sparse normal
+    # matrix fits, the simplex engines would need m x (n+m) tableaux
+    if sparse is None:
+        print("no scipy, sparse staircase programmes skipped")
+    for periods in ([100, 1000, 4000] if sparse is not None else []):
+        k = 10
+        m, n = periods*k, periods*2*k
+        rows = [{} for _ in range(m)]
+        for j in range(n):
+            t = j//(2*k)
+            for i in rng.choice(k, 3, replace=False).tolist():
+                rows[t*k+i][j] = int(rng.integers(1, 10))
+            if t+1 < periods:
+                rows[(t+1)*k+int(rng.integers(k))][j] = -int(rng.integers(1, 5))
+        programme = {
+            "function": rng.integers(1, 30, n).tolist(),
+            "contraintes": [[row, int(rng.integers(100, 1000))] for row in rows],
+        }
+        t = time.perf_counter()
+        s = InteriorPointSolver(programme, crossover=False)
+        print(f"m={m} n={n} ipm={time.perf_counter()-t:.3f}s({s.iterations}it {'dense' if s.dense_normal else 'sparse'} normal matrix z={s.solution()['z']:.4f})")
@@ -2,8 +2,11 @@ import os,sys
 sys.path.append(os.curdir)
 import random as rd
 from manimlib import *
-from polygon import polygons_from_lines
+from polygon import feasible_polygons
 from convexhull import convex_hull
+from solver import SimplexSolver
+from sensitivity import sensitivity
+from parametric import ParametricObjective
 
 def to_int(r):
     e=int(r)
@@ -302,9 +305,8 @@ class PL(Scene):
 
         self.polys=VGroup(*[
                 Polygon(*[axes.c2p(r[0],r[1]) for r in polygon],color=[GREEN,RED][i],fill_opacity=.7,stroke_width=0)
-                for i,polygon in enumerate(polygons_from_lines([
-                    [i for i in d] for d in lines
-                    ]
+                for i,polygon in enumerate(feasible_polygons(
+                    lines
                     ,x_max=axes.x_range[1],
                     y_max=axes.y_range[1],
                     minim=minimizing
@@ -348,6 +350,41 @@ class PL(Scene):
         self.add(self.dots,self.solutions,self.sol_box)
 
 
+    def objective_ranges(self):
+        """Optimality ranges of both objective coefficients, from the final
+        simplex table. Unlimited ends are drawn at 0 and twice the coefficient,
+        as calculate_ranges does."""
+        func=self.func
+        sign=-1 if self.minimizing else 1
+        programme={
+            'function':[sign*v for v in func],
+            'contraintes':[[[sign*a,sign*b],sign*c] for a,b,c in self.lines],
+        }
+        solver=SimplexSolver(programme,history=False)
+        ranges=sensitivity(solver.tables[-1]['table'],programme)['objective_ranges']
+        res=[]
+        for v,(low,high) in zip(func,ranges):
+            if self.minimizing:
+                low,high=-high,-low
+            res.append([0 if low==-float('inf') else low,2*v if high==float('inf') else high])
+        return res
+
+    def parametric(self):
+        """Parametric sweeps giving the optimal vertex for any (X,Y) with Y!=0:
+        it only depends on t=X/|Y| and the sign of Y, so max sign*(t,±1).(x,y)
+        is computed once for each sign (None where the solve fails)."""
+        func=self.func
+        sign=-1 if self.minimizing else 1
+        contraintes=[[[sign*a,sign*b],sign*c] for a,b,c in self.lines]
+        sweeps={}
+        for s in (1,-1):
+            t0=func[0]/abs(func[1]) if func[1] and s*func[1]>0 else 0
+            try:
+                sweeps[s]=ParametricObjective({'function':[0,sign*s],'contraintes':contraintes},[sign,0],t0=t0)
+            except Exception:
+                sweeps[s]=None
+        return sweeps
+
     def analyse(self):
         func=self.func
         axes=self.axes
@@ -361,7 +398,10 @@ class PL(Scene):
         except:
             self.concerned_lines=c_lines
 
-        [start_1,end_1],[start_2,end_2]=calculate_ranges(self.concerned_lines,func)
+        try:
+            [start_1,end_1],[start_2,end_2]=self.objective_ranges()
+        except Exception:
+            [start_1,end_1],[start_2,end_2]=calculate_ranges(self.concerned_lines,func)
         
 
         # TODO : animate the process of finding the ranges of optimality
@@ -386,7 +426,19 @@ class PL(Scene):
         )
         def get_results():
             return [p[0]*X.get_value() + p[1]*Y.get_value() for p in intersections]
+        sweeps=self.parametric()
+        # piece of a sweep -> index of its vertex in intersections
+        vertex={}
         def opt_index():
+            x,y=X.get_value(),Y.get_value()
+            sweep=sweeps[1 if y>0 else -1] if y else None
+            if sweep:
+                k=sweep.piece(x/abs(y))
+                p=sweep.pieces[k]['x']
+                if p is not None:
+                    if (y>0,k) not in vertex:
+                        vertex[y>0,k]=min(range(len(intersections)),key=lambda i:(intersections[i][0]-p[0])**2+(intersections[i][1]-p[1])**2)
+                    return vertex[y>0,k]
             values = get_results()
             return values.index(min(values)) if self.minimizing else values.index(max(values))
         box = always_redraw(lambda:
@@ -0,0 +1,80 @@
+import time
+
+# Per-pivot instrumentation of SimplexSolver (on_pivot=... or metrics=True).
+# The solver only calls into a Metrics object when one is attached, so an
+# uninstrumented solve pays one attribute test per pivot phase.
+
+
+class Metrics:
+    """Times the pricing / ratio test / update phases of every pivot and
+    passes one record per pivot to `hook`:
+
+    {'iteration', 'phase' ('primal' or 'dual'), 'entering', 'leaving',
+     'flips', 'objective', 'degenerate', 'pricing', 'ratio', 'update',
+     'bits' (exact engines with bits()), 'nnz' (sparse engine)}
+
+    summary() aggregates the records of the last solve.
+    """
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.reset()
+
+    def reset(self):
+        self.pivots = 0
+        self.degenerate = 0
+        self.totals = {'pricing': 0.0, 'ratio': 0.0, 'update': 0.0}
+        self.max_bits = None
+        self.max_nnz = None
+        self.nnz = None
+        self.begin(None)
+
+    def begin(self, tableau):
+        """Start timing a new pivot on `tableau`."""
+        self.current = {'pricing': 0.0, 'ratio': 0.0, 'update': 0.0}
+        self.objective = None if tableau is None else tableau.objective()
+        self.clock = time.perf_counter()
+
+    def lap(self, phase):
+        """Charge the time since the last lap to `phase` (None: to nothing)."""
+        now = time.perf_counter()
+        if phase:
+            self.current[phase] += now-self.clock
+        self.clock = now
+
+    def pivot(self, tableau, iteration, phase, entering, leaving, flips):
+        """Record the pivot just applied to `tableau`."""
+        self.lap('update')
+        objective = tableau.objective()
+        record = {
+            'iteration': iteration,
+            'phase': phase,
+            'entering': entering,
+            'leaving': leaving,
+            'flips': flips,
+            'objective': objective,
+            'degenerate': objective == self.objective,
+            **self.current,
+        }
+        if hasattr(tableau, 'bits'):
+            record['bits'] = tableau.bits()
+            self.max_bits = tuple(max(a, b) for a, b in zip(record['bits'], self.max_bits or (0, 0)))
+        if hasattr(tableau, 'nnz'):
+            record['nnz'] = self.nnz = tableau.nnz()
+            self.max_nnz = max(self.max_nnz or 0, self.nnz)
+        self.pivots += 1
+        self.degenerate += record['degenerate']
+        for phase in self.totals:
+            self.totals[phase] += self.current[phase]
+        if self.hook:
+            self.hook(record)
+
+    def summary(self):
+        return {
+            'pivots': self.pivots,
+            'degenerate': self.degenerate,
+            **self.totals,
+            'max_bits': self.max_bits,
+            'max_nnz': self.max_nnz,
+            'nnz': self.nnz,
+        }
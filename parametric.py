@@ -0,0 +1,152 @@
+import bisect
+import time
+from fractions import Fraction
+from solver import SimplexSolver, Unbounded
+
+# Parametric objective: the optimal solutions of max (c + t*d).x, Ax <= b,
+# x >= 0 for every t at once. One solve at t0, then the parametric simplex
+# walks to both sides: on a basis the Z row is zc + t*zd, the basis stays
+# optimal until some zc_j + t*zd_j turns positive, and at that breakpoint
+# column j enters. Afterwards a query for any t is a binary search over the
+# breakpoints.
+
+
+class ParametricObjective:
+    """Optimal pieces of max (c + t*d).x over t in [t_min, t_max].
+
+    `breakpoints` is sorted and pieces[k] is optimal for t between
+    breakpoints[k-1] and breakpoints[k] (both ends included). A piece is a
+    dict {'basis', 'x', 'z': (c.x, d.x)}, or {'basis': None, 'x': None,
+    'z': None} where the objective is unbounded. Ties at degenerate
+    breakpoints may give pieces of zero length.
+    """
+
+    def __init__(self, programme, direction, t_min=None, t_max=None, t0=0, engine='fraction', pivot_rule='dantzig'):
+        if any(hi is not None for _, hi in programme.get('bounds') or []):
+            raise ValueError("parametric analysis does not handle upper bounds")
+        self.programme = programme
+        self.direction = list(direction)
+        self.t_min = t_min
+        self.t_max = t_max
+        if t_min is not None:
+            t0 = max(t0, t_min)
+        if t_max is not None:
+            t0 = min(t0, t_max)
+        self.t0 = t0
+        self.pivots = 0
+        start = time.perf_counter()
+        c = programme['function']
+        shifted = dict(programme, function=[a+t0*b for a, b in zip(c, self.direction)])
+        self.solver = SimplexSolver(shifted, engine=engine, history=False, pivot_rule=pivot_rule)
+        self.solver.programme = programme
+        table = self.solver.tableau.snapshot()
+        below, low = self._sweep(self.solver.make_tableau(table), -1, t_min)
+        above, high = self._sweep(self.solver.make_tableau(table), 1, t_max)
+        self.breakpoints = low[::-1]+high
+        self.pieces = below[::-1]+above[1:]
+        self.time = time.perf_counter()-start
+
+    def _rows(self, table):
+        """Z rows of `table` for c and for d."""
+        zc = self.solver.price_out([*table[:-1], None])[-1][1:]
+        zd = self.solver.price_out([*table[:-1], None], self.direction)[-1][1:]
+        return zc, zd
+
+    def _piece(self, table):
+        n = len(self.programme['function'])
+        x = [lo for lo, _ in self.solver.bounds()]
+        for row in table[1:-1]:
+            j = table[0].index(row[0])-1
+            if j < n:
+                x[j] += row[-1]
+        z = (sum(a*v for a, v in zip(self.programme['function'], x)),
+             sum(a*v for a, v in zip(self.direction, x)))
+        return {'basis': [row[0] for row in table[1:-1]], 'x': x, 'z': z}
+
+    def _sweep(self, tableau, sign, limit):
+        """Pieces met moving t from t0 in direction `sign` (the one at t0
+        first) and the breakpoints between them."""
+        tol = tableau.tol
+        t = self.t0
+        pieces, points = [], []
+        while True:
+            table = tableau.snapshot()
+            pieces.append(self._piece(table))
+            zc, zd = self._rows(table)
+            # column j turns attractive at t_j = -zc_j/zd_j, the first one on
+            # our side is the breakpoint (smallest index on ties)
+            col = None
+            for j in range(len(zd)-1):
+                if sign*zd[j] > tol:
+                    # exact engines: the Z rows may hold ints, keep t exact
+                    tj = (Fraction(-zc[j]) if tol == 0 else -zc[j])/zd[j]
+                    if col is None or sign*tj < sign*t_next:
+                        col, t_next = j+1, tj
+            if col is None:
+                break
+            t_next = max(t, t_next) if sign > 0 else min(t, t_next)
+            if limit is not None and sign*t_next >= sign*limit:
+                break
+            points.append(t_next)
+            row = tableau.leaving(col, bland=True)
+            if row is None:
+                pieces.append({'basis': None, 'x': None, 'z': None})
+                break
+            tableau.pivot(row, col)
+            self.pivots += 1
+            t = t_next
+        return pieces, points
+
+    def piece(self, t):
+        """Index in `pieces` of a piece optimal at t, a bounded one when t is
+        a breakpoint between a bounded and an unbounded piece."""
+        if (self.t_min is not None and t < self.t_min) or (self.t_max is not None and t > self.t_max):
+            raise ValueError(f"t={t} outside [{self.t_min}, {self.t_max}]")
+        k = bisect.bisect_left(self.breakpoints, t)
+        for i in range(k, bisect.bisect_right(self.breakpoints, t)+1):
+            if self.pieces[i]['x'] is not None:
+                return i
+        return k
+
+    def solution(self, t):
+        """{'x', 'z'} optimal at t, like SimplexSolver.solution(); raises
+        Unbounded where the objective is unbounded."""
+        p = self.pieces[self.piece(t)]
+        if p['x'] is None:
+            raise Unbounded(f"objective unbounded at t={t}")
+        return {'x': p['x'], 'z': p['z'][0]+t*p['z'][1]}
+
+    def stats(self):
+        return {
+            'breakpoints': len(self.breakpoints),
+            'pivots': self.pivots,
+            'time': self.time,
+        }
+
+
+if __name__ == "__main__":
+    # t on the breakpoint where the objective turns unbounded: bounded there
+    p = ParametricObjective({'function': [-4, -2, 5, -1], 'contraintes': [[[-1, 0, 9, 8], 21], [[3, 0, 2, 0], 30]]},
+                            [2, -2, -4, 1])
+    assert -1 in p.breakpoints and p.solution(-1)['z'] == 21
+
+    # one parametric analysis and bisect queries vs a fresh solve per query
+    import random
+    from bench import dense
+    rd = random.Random(0)
+    for m, n in [(10, 20), (20, 40), (40, 80)]:
+        programme = dense(m, n, 1)
+        d = [rd.randint(-20, 20) for _ in range(n)]
+        ts = [rd.uniform(-5, 5) for _ in range(20)]
+        p = ParametricObjective(programme, d, t_min=-5, t_max=5, engine='float')
+        start = time.perf_counter()
+        z = [p.solution(t)['z'] for t in ts]
+        query = (time.perf_counter()-start)/len(ts)
+        start = time.perf_counter()
+        for t, v in zip(ts, z):
+            s = SimplexSolver(dict(programme, function=[a+t*b for a, b in zip(programme['function'], d)]),
+                              engine='float', history=False)
+            assert abs(s.solution()['z']-v) <= 1e-6*max(1, abs(v))
+        solve = (time.perf_counter()-start)/len(ts)
+        print(f"m={m} n={n} breakpoints={len(p.breakpoints)} precompute={p.time:.3f}s "
+              f"query={query*1e6:.1f}us re-solve={solve*1e3:.2f}ms")
@@ -0,0 +1,145 @@
+import numpy as np
+
+# Pivot rules for SimplexSolver(pivot_rule=...).
+# A rule picks the entering column from the reduced costs of an engine (see
+# tableau.py / revised.py) and may keep weights updated from the pivot row and
+# column; the ratio test itself stays exact inside the engine.
+
+
+class PivotRule:
+    name = ''
+
+    def start(self, tab):
+        pass
+
+    def entering(self, tab):
+        raise NotImplementedError
+
+    def leaving(self, tab, col):
+        return tab.leaving(col)
+
+    def update(self, tab, row, col):
+        """Called with the chosen pivot, before the engine applies it."""
+        pass
+
+
+class Dantzig(PivotRule):
+    """Largest reduced cost, the rule SimplexSolver always used."""
+    name = 'dantzig'
+
+    def entering(self, tab):
+        return tab.entering()
+
+
+class Bland(PivotRule):
+    """Lowest improving index and lowest basic index on ratio ties: never cycles."""
+    name = 'bland'
+
+    def entering(self, tab):
+        d = tab.reduced_costs()
+        candidates = np.flatnonzero(d > tab.tol)
+        if not len(candidates):
+            return None
+        return int(candidates[0])+1
+
+    def leaving(self, tab, col):
+        return tab.leaving(col, bland=True)
+
+
+class _Weighted(PivotRule):
+    """Picks max d_j^2 / w_j among improving columns."""
+
+    def entering(self, tab):
+        d = tab.reduced_costs()
+        if not len(d):
+            return None
+        score = np.where(d > tab.tol, d*d/self.w, -1)
+        j = int(np.argmax(score))
+        if score[j] < 0:
+            return None
+        return j+1
+
+
+class SteepestEdge(_Weighted):
+    """Steepest edge, w_j = 1 + ||B^-1 a_j||^2.
+
+    The reference weights are computed once from the starting tableau and then
+    kept exact with the Goldfarb-Reid recurrence.
+    """
+    name = 'steepest'
+
+    def start(self, tab):
+        n = len(tab.reduced_costs())
+        self.w = np.ones(n)
+        for col in range(1, n+1):
+            a = tab.column(col)
+            self.w[col-1] = 1+a @ a
+
+    def update(self, tab, row, col):
+        q = col-1
+        alpha = np.array(tab.column(col))
+        r = np.array(tab.row(row))
+        ratio = r/r[q]
+        dots = tab.tmul(alpha)
+        gq = self.w[q]
+        self.w = np.maximum(self.w - 2*ratio*dots + ratio*ratio*gq, 1+ratio*ratio)
+        self.w[tab.basic_index(row-1)-1] = max(gq/(r[q]*r[q]), 1)
+        self.w[q] = 1
+
+
+class Devex(_Weighted):
+    """Forrest-Goldfarb Devex: approximate steepest edge in a reference framework."""
+    name = 'devex'
+
+    def start(self, tab):
+        self.w = np.ones(len(tab.reduced_costs()))
+
+    def update(self, tab, row, col):
+        q = col-1
+        r = np.array(tab.row(row))
+        ratio = r/r[q]
+        wq = self.w[q]
+        self.w = np.maximum(self.w, ratio*ratio*wq)
+        self.w[tab.basic_index(row-1)-1] = max(wq/(r[q]*r[q]), 1)
+        self.w[q] = 1
+
+
+class PartialPricing(PivotRule):
+    """Prices one block of `size` columns at a time, moving on when a block has
+    no improving column; the search resumes from the last successful block."""
+    name = 'partial'
+
+    def __init__(self, size=None):
+        self.size = size
+
+    def start(self, tab):
+        self.n = len(tab.reduced_costs())
+        self.size = self.size or max(1, int(np.ceil(np.sqrt(self.n))))
+        self.block = 0
+
+    def entering(self, tab):
+        blocks = int(np.ceil(self.n/self.size))
+        for k in range(blocks):
+            b = (self.block+k) % blocks
+            cols = np.arange(b*self.size, min((b+1)*self.size, self.n))
+            d = tab.reduced_costs(cols)
+            j = int(np.argmax(d))
+            if d[j] > tab.tol:
+                self.block = b
+                return int(cols[j])+1
+        return None
+
+
+RULES = {
+    'dantzig': Dantzig,
+    'bland': Bland,
+    'steepest': SteepestEdge,
+    'devex': Devex,
+    'partial': PartialPricing,
+}
+
+
+def make_rule(rule):
+    if isinstance(rule, PivotRule):
+        return rule
+    return RULES[rule]()
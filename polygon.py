@@ -1,99 +1,76 @@
+import bisect
 import math
+from collections import deque
 import numpy as np
 from convexhull import convex_hull
+from geometry import cross, side, offset, orient, intersection, coincident
 EPS = 1e-9
 ROUND = 9
 
 def norm(p):
     return (round(p[0], ROUND), round(p[1], ROUND))
 
+def kernel_line(l):
+    # lines here are a*x + b*y + c = 0, geometry.py's a*x + b*y = c
+    return (l[0], l[1], -l[2])
+
 def intersect(l1, l2):
-    a1,b1,c1 = l1
-    a2,b2,c2 = l2
-    det = a1*b2 - a2*b1
-    if abs(det) < EPS:
-        return None
-    x = (b1*c2 - b2*c1) / det
-    y = (c1*a2 - c2*a1) / det
-    return norm((x,y))
-
-def unique_points(pts):
-    uniq = []
-    for p in pts:
-        if not any(math.hypot(p[0]-q[0], p[1]-q[1]) < 10**(-ROUND) for q in uniq):
-            uniq.append(p)
-    return uniq
-
-def sort_points_along_line(line, pts):
-    a,b,c = line
-    dx, dy = b, -a   # direction vector of line
-    if abs(dx) < EPS and abs(dy) < EPS:
-        return sorted(pts)
-    return sorted(pts, key=lambda p: p[0]*dx + p[1]*dy)
+    p = intersection(kernel_line(l1), kernel_line(l2))
+    return None if p is None else norm(p)
+
+def exact_order(items, compare):
+    """Insertion sort pass with an exact comparison (compare(p, q) > 0 when p
+    goes after q) over items already sorted by a float key: only the
+    neighbours the floats got wrong move."""
+    for n in range(1, len(items)):
+        item = items[n]
+        while n and compare(items[n-1], item) > 0:
+            items[n] = items[n-1]
+            n -= 1
+        items[n] = item
+    return items
 
 def build_segments(lines):
+    # the points of every line are ordered and grouped with exact predicates,
+    # and the point where several lines meet is keyed by (and computed from)
+    # the two lowest of their indices: every line sees the very same vertex,
+    # even when distinct vertices round to the same coordinates. A line given
+    # twice gets the segments of its first copy.
+    # Returns the keys of the vertices on every line, in the direction
+    # (b, -a), and the point of every key
+    kl = [kernel_line(L) for L in lines]
+    first = [next(k for k in range(i+1) if coincident(kl[k], kl[i])) for i in range(len(kl))]
+    points = {}
     segs = []
-    all_pts = set()
-    for i, L in enumerate(lines):
+    for i, L in enumerate(kl):
+        if first[i] != i:
+            segs.append(list(segs[first[i]]))
+            continue
+        a, b, c = L
+        def along(j, k):
+            # sign of the difference of positions along L's direction (b, -a)
+            return -side(kl[k], L, kl[j])*cross(L, kl[k])
+        def position(j):
+            a2, b2, c2 = kl[j]
+            det = a*b2 - a2*b
+            return ((c*b2 - c2*b)*b - (a*c2 - a2*c)*a)/det if det else 0
+        others = exact_order(sorted((j for j in range(len(kl)) if first[j] == j and cross(L, kl[j])), key=position), along)
         pts = []
-        for j, M in enumerate(lines):
-            if i == j: continue
-            p = intersect(L, M)
-            if p is not None and p[0]>=0 and p[1]>=0:
-                pts.append(p)
-                all_pts.add(p)
-        pts = unique_points(pts)
-        pts = sort_points_along_line(L, pts)
-        segs.append(pts)
-    return segs, all_pts
-
-def build_graph(segs):
-    g = {}
-    def add(a,b):
-        g.setdefault(a, set()).add(b)
-        g.setdefault(b, set()).add(a)
-    for pts in segs:
-        for i in range(len(pts)-1):
-            a = pts[i]; b = pts[i+1]
-            if a == b: continue
-            add(a,b)
-    # convert sets -> lists
-    for k in list(g.keys()):
-        g[k] = list(g[k])
-    return g
-
-def build_ccw_neighbors(graph):
-    ccw = {}
-    for v, neigh in graph.items():
-        vx, vy = v
-        neigh_sorted = sorted(neigh, key=lambda u: math.atan2(u[1]-vy, u[0]-vx))
-        ccw[v] = neigh_sorted
-    return ccw
-
-def walk_face_from_directed_edge(ccw_neigh, start_u, start_v, maxsteps=10000):
-    start = (start_u, start_v)
-    u, v = start_u, start_v
-    face = []
-    steps = 0
-    while True:
-        face.append(u)
-        steps += 1
-        if steps > maxsteps:
-            raise RuntimeError("stuck in face walk loop")
-        neigh = ccw_neigh[v]
-        # find index of u in ccw list of v
-        try:
-            idx = neigh.index(u)
-        except ValueError:
-            # numerical mismatch — abort
-            return None
-        # to keep face on left of directed edges, choose neighbor BEFORE u in CCW order
-        next_idx = (idx - 1) % len(neigh)
-        w = neigh[next_idx]
-        u, v = v, w
-        if (u, v) == start:
-            break
-    return face
+        for n, j in enumerate(others):
+            if n and along(others[n-1], j) == 0:
+                group.append(j)
+                continue
+            group = [i, j]
+            pts.append(group)
+        segs.append([])
+        for group in pts:
+            key = tuple(sorted(group)[:2])
+            if key not in points:
+                points[key] = intersect(lines[key[0]], lines[key[1]])
+            p = points[key]
+            if p[0]>=0 and p[1]>=0:
+                segs[-1].append(key)
+    return segs, points
 
 def polygon_area(poly):
     a = 0.0
@@ -104,73 +81,175 @@ def polygon_area(poly):
         a += x1*y2 - x2*y1
     return 0.5 * a
 
-def pick_bottom_face(faces):
-    cand = []
-    for f in faces:
-        if (0.0, 0.0) in f:
-            area = abs(polygon_area(f))
-            if area > EPS:
-                cand.append((area, f))
-    if not cand:
-        return None
-    cand.sort(key=lambda x: x[0])
-    return cand[0][1]
-
-def enumerate_all_faces(graph):
-    ccw_neigh = build_ccw_neighbors(graph)
-    visited = { (u,v): False for u in graph for v in graph[u] }
-    faces = []
-    for (u0, v0), seen in list(visited.items()):
-        if seen: continue
-        u, v = u0, v0
-        face = []
+def _angle(u):
+    """Angle of direction u, the float sort key _turn() corrects."""
+    return math.atan2(u[1], u[0])
+
+def _turn(u, v):
+    """>0 when direction u comes after direction v in the order of _angle,
+    (-pi, pi], decided exactly."""
+    hu = u[1] > 0 or (u[1] == 0 and u[0] < 0)
+    hv = v[1] > 0 or (v[1] == 0 and v[0] < 0)
+    if hu != hv:
+        return hu - hv
+    return cross(v, u)
+
+class Arrangement:
+    """Half-edge (DCEL) structure of the arrangement of `lines` (a, b, c),
+    a*x + b*y + c = 0, in the quadrant x >= 0, y >= 0, built once.
+
+    Half-edge e goes from vertex origin[e] to origin[twin(e)], with
+    twin(e) = e ^ 1; next[e] follows it around face[e], the face on its
+    left. Bounded faces are counterclockwise (positive area), the outer face
+    is the one of negative area. faces[f] is a half-edge of face f.
+    """
+
+    def __init__(self, lines):
+        self.lines = [tuple(l) for l in lines]
+        segs, points = build_segments(self.lines)
+        # vertices are told apart by their keys, their coordinates are only
+        # used to measure and to look them up (index, the first vertex at
+        # those rounded coordinates)
+        self.vertices = []
+        self.origin = []
+        self.line = []
+        vertex = {}
+        self.index = {}
+        seen = set()
+        for i, keys in enumerate(segs):
+            for p, q in zip(keys, keys[1:]):
+                # a line given twice adds no edge
+                if (p, q) in seen:
+                    continue
+                seen.add((p, q))
+                for v in (p, q):
+                    if v not in vertex:
+                        vertex[v] = len(self.vertices)
+                        self.index.setdefault(points[v], vertex[v])
+                        self.vertices.append(points[v])
+                # e = 2k runs along the line's direction (b, -a), e ^ 1 back
+                self.origin += [vertex[p], vertex[q]]
+                self.line += [i, i]
+        # outgoing half-edges of every vertex, counterclockwise: sorted by
+        # the angle of their line, then by exact comparisons
+        self.out = [[] for _ in self.vertices]
+        for e, v in enumerate(self.origin):
+            self.out[v].append(e)
+        self.angles = []
+        for v, out in enumerate(self.out):
+            out.sort(key=self._angle)
+            exact_order(out, lambda e1, e2: _turn(self._direction(e1), self._direction(e2)))
+            self.angles.append([self._angle(e) for e in out])
+        # arriving along e ^ 1, the face on the left goes on with the
+        # outgoing half-edge just clockwise from e
+        self.next = [0]*len(self.origin)
+        for out in self.out:
+            for k, e in enumerate(out):
+                self.next[e ^ 1] = out[k-1]
+        self.face = [-1]*len(self.origin)
+        self.faces = []
+        for e in range(len(self.origin)):
+            if self.face[e] < 0:
+                f = len(self.faces)
+                self.faces.append(e)
+                while self.face[e] < 0:
+                    self.face[e] = f
+                    e = self.next[e]
+        self.polygons = [self.polygon(f) for f in range(len(self.faces))]
+        self.areas = [polygon_area(p) for p in self.polygons]
+        self.boxes = [(min(x for x, _ in p), min(y for _, y in p), max(x for x, _ in p), max(y for _, y in p))
+                      for p in self.polygons]
+        self.last = next((f for f in range(len(self.faces)) if self.bounded(f)), None)
+        self.edges_of_line = {}
+        for e, i in enumerate(self.line):
+            self.edges_of_line.setdefault(i, []).append(e)
+
+    def _direction(self, e):
+        a, b = self.lines[self.line[e]][:2]
+        return (-b, a) if e & 1 else (b, -a)
+
+    def _angle(self, e):
+        return _angle(self._direction(e))
+
+    def polygon(self, f):
+        """Vertices of face f, in the order of its half-edges."""
+        pts = []
+        start = e = self.faces[f]
         while True:
-            visited[(u,v)] = True
-            face.append(u)
-            neigh = ccw_neigh[v]
-            try:
-                idx = neigh.index(u)
-            except ValueError:
-                break
-            w = neigh[(idx - 1) % len(neigh)]
-            u, v = v, w
-            if (u, v) == (u0, v0):
+            pts.append(self.vertices[self.origin[e]])
+            e = self.next[e]
+            if e == start:
+                return pts
+
+    def bounded(self, f):
+        return self.areas[f] > EPS
+
+    def face_at(self, point, direction):
+        """Face of the corner at vertex `point` that contains `direction`,
+        None if `point` is not a vertex."""
+        v = self.index.get(norm(point))
+        if v is None:
+            return None
+        k = bisect.bisect_right(self.angles[v], math.atan2(direction[1], direction[0]))
+        return self.face[self.out[v][k-1]]
+
+    def bottom_face(self):
+        """Face in the corner at the origin."""
+        return self.face_at((0, 0), (1, 1))
+
+    def face_containing(self, point, start=None):
+        """Bounded face containing `point` (one of them if it lies on an edge),
+        None outside every bounded face.
+
+        Walks from face `start` (by default the last answer): whenever the
+        point is on the right of an edge, go to the face across it. Each
+        step crosses one more of the lines separating the point from the
+        start face, so there are at most len(lines) of them. The lines go on
+        past the box, so the bounded faces need not make a convex region:
+        a walk that steps out of them falls back to scan().
+        """
+        f = self.last if start is None else start
+        if f is None:
+            return None
+        for _ in range(len(self.faces)):
+            e = first = self.faces[f]
+            while True:
+                p = self.vertices[self.origin[e]]
+                q = self.vertices[self.origin[e ^ 1]]
+                if orient(p, q, point) < 0:
+                    f = self.face[e ^ 1]
+                    break
+                e = self.next[e]
+                if e == first:
+                    self.last = f
+                    return f
+            if not self.bounded(f):
                 break
-        if len(face) >= 3 and abs(polygon_area(face)) > EPS:
-            faces.append(face)
-    return faces, ccw_neigh
-
-def top_face_by_sliding(graph, all_points):
-    # choose highest vertex
-    highest = max(all_points, key=lambda p: p[1])
-    # neighbors sorted by descent (most negative dy first)
-    neighs = sorted(graph.get(highest, []), key=lambda n: (n[1]-highest[1], abs(n[0]-highest[0])))
-    if not neighs:
-        return None
-    faces, ccw = enumerate_all_faces(graph)
-    # try each neighbor as initial directed edge (highest -> neigh) in order of steepest descent
-    for n in neighs:
-        face = walk_face_from_directed_edge(ccw, highest, n)
-        if face and highest in face and abs(polygon_area(face)) > EPS:
-            lis=[]
-
-            for node in face :
-                if node[0]>=0 and node[1]>=0:
-                    lis.append(node)
-            
-            return lis
-    # fallback: if none found, pick smallest face containing highest
-    cand = []
-    for f in faces:
-        if highest in f:
-            print(f)
-            cand.append((abs(polygon_area(f)), f))
-    if not cand:
+        return self.scan(point)
+
+    def scan(self, point):
+        """face_containing by testing every face."""
+        x, y = point
+        for f, (x0, y0, x1, y1) in enumerate(self.boxes):
+            if not (self.bounded(f) and x0 <= x <= x1 and y0 <= y <= y1):
+                continue
+            poly = self.polygons[f]
+            # faces of a line arrangement are convex
+            if all(orient(poly[i-1], poly[i], point) >= 0 for i in range(len(poly))):
+                return f
         return None
-    cand.sort(key=lambda x: x[0])
 
+    def faces_of_line(self, i):
+        """Bounded faces having an edge on line i."""
+        faces = {self.face[e] for e in self.edges_of_line.get(i, [])}
+        return sorted(f for f in faces if self.bounded(f))
 
-    return cand[0][1]
+    def stats(self):
+        return {
+            'vertices': len(self.vertices),
+            'half_edges': len(self.origin),
+            'faces': len(self.faces),
+        }
 
 def get_uper_polygon(face,x_max,y_max):
 
@@ -188,19 +267,96 @@ def polygons_from_lines(lines,x_max,y_max,minim=True):
     lines.append([1,0,x_max])
     lines.append([0,1,y_max])
 
-    lines=[(line[0],line[1],-line[2]) for line in lines]
+    # both sides by half-plane intersection (above every line is not always
+    # the cell at the top right corner of the arrangement)
+    return feasible_polygons(lines[:-2],x_max,y_max,minim)
 
-    full = list(lines) + [(1,0,0), (0,1,0),]
-    segs, all_pts = build_segments(full)
-    graph = build_graph(segs)
-    faces, _ = enumerate_all_faces(graph)
-    bottom = convex_hull(pick_bottom_face(faces))
-    
-    full_poly = top_face_by_sliding(graph, all_pts)
-    top=get_uper_polygon(bottom,x_max,y_max)
+# Feasible regions by half-plane intersection: the half-planes are sorted by
+# the angle of their boundary and swept once with a deque, O(n log n) for n
+# lines, instead of building and walking the whole arrangement.
+
+def half_planes(lines, x_max, y_max, below=True):
+    """(a, b, c) meaning a*x + b*y <= c for every line [a, b, c] (>= c when
+    below is False), and the box 0 <= x <= x_max, 0 <= y <= y_max."""
+    s = 1 if below else -1
+    planes = [(s*a, s*b, s*c) for a, b, c in lines]
+    return planes + [(-1, 0, 0), (0, -1, 0), (1, 0, x_max), (0, 1, y_max)]
+
+def _same_direction(p, q):
+    return cross(p, q) == 0 and p[0]*q[0] + p[1]*q[1] > 0
+
+def _boundary(h):
+    """Direction (-b, a) of the boundary of h, with h on its left."""
+    return (-h[1], h[0])
+
+def half_plane_intersection(planes):
+    """Convex polygon (CCW, as a list of points) where every a*x + b*y <= c of
+    `planes` holds, [] when it is empty. The intersection must be bounded."""
+    # direction (-b, a) keeps the half-plane on its left; of parallel
+    # half-planes only the tightest one matters
+    planes = exact_order(sorted((h for h in planes if h[0] or h[1]), key=lambda h: _angle(_boundary(h))),
+                         lambda p, q: _turn(_boundary(p), _boundary(q)))
+    kept = []
+    for h in planes:
+        if kept and _same_direction(kept[-1], h):
+            if offset(h, kept[-1]) < 0:
+                kept[-1] = h
+            continue
+        kept.append(h)
+    if len(kept) > 1 and _same_direction(kept[0], kept[-1]):
+        h = kept.pop()
+        if offset(h, kept[0]) < 0:
+            kept[0] = h
+    hull = deque()
+    for h in kept:
+        # side() > 0: the corner of the two planes violates h
+        while len(hull) >= 2 and side(h, hull[-1], hull[-2]) > 0:
+            hull.pop()
+        while len(hull) >= 2 and side(h, hull[0], hull[1]) > 0:
+            hull.popleft()
+        if hull and cross(hull[-1], h) == 0:
+            # opposite boundaries left next to each other: with the box in
+            # the set that only happens when the intersection is empty
+            return []
+        hull.append(h)
+    while len(hull) >= 3 and side(hull[0], hull[-1], hull[-2]) > 0:
+        hull.pop()
+    while len(hull) >= 3 and side(hull[-1], hull[0], hull[1]) > 0:
+        hull.popleft()
+    if len(hull) < 3:
+        return []
+    hull = list(hull)
+    # corner i is where hull[i-1] and hull[i] meet, the same point as corner
+    # i-1 when hull[i-2] goes through it too; distinct corners closer than
+    # the rounding of norm() are merged as well
+    pts = []
+    for i in range(len(hull)):
+        if side(hull[i-2], hull[i-1], hull[i]) != 0:
+            p = norm(intersection(hull[i-1], hull[i]))
+            if not pts or p != pts[-1]:
+                pts.append(p)
+    if len(pts) > 1 and pts[0] == pts[-1]:
+        pts.pop()
+    if len(pts) < 3 or abs(polygon_area(pts)) < EPS:
+        return []
+    return pts
+
+def _hull_order(poly):
+    """Drop collinear vertices and start at the lowest (then leftmost) point,
+    the order convex_hull returns."""
+    n = len(poly)
+    pts = [poly[i] for i in range(n) if orient(poly[i-1], poly[i], poly[(i+1)%n]) != 0]
+    if not pts:
+        return pts
+    k = pts.index(min(pts, key=lambda p: (p[1], p[0])))
+    return pts[k:] + pts[:k]
+
+def feasible_polygons(lines, x_max, y_max, minim=True):
+    """polygons_from_lines by half-plane intersection, without changing `lines`."""
+    bottom = _hull_order(half_plane_intersection(half_planes(lines, x_max, y_max)))
     if not minim:
-        return [bottom,top]
-    return [convex_hull(full_poly),bottom]
+        return [bottom, get_uper_polygon(bottom, x_max, y_max)]
+    return [_hull_order(half_plane_intersection(half_planes(lines, x_max, y_max, below=False))), bottom]
 
 if __name__ == "__main__":
 
@@ -212,4 +368,66 @@ if __name__ == "__main__":
         ]
     bottom, top= polygons_from_lines(lines,x_max=20,y_max=10,minim=False)
     print(bottom)
-    print(top)
\ No newline at end of file
+    print(top)
+    # polygons_from_lines appended its two box lines to `lines`
+    print(feasible_polygons(lines[:-2], x_max=20, y_max=10, minim=False) == [bottom, top])
+
+    # nearly parallel lines: every vertex of the feasible polygon satisfies
+    # all the constraints (up to float rounding)
+    lines = [[2.6445285384666195, 1.7642387075143962, 28.609371485022436],
+             [2.8707640571215944, 0.28652625979698365, 17.577783929012796],
+             [2.8707640571218813, 0.28652625979698365, 17.57778392901455]]
+    for bottom in [feasible_polygons(lines, 20, 10, minim=False)[0],
+                   polygons_from_lines([list(l) for l in lines], 20, 10, minim=False)[0]]:
+        assert max(max(a*x+b*y-c, x-20, y-10, -x, -y) for a, b, c in lines for x, y in bottom) <= 1e-6
+
+    # minim=True: the first polygon is the region above the line, in hull order
+    expected = [(0.0, 2.0), (8.0, 10.0), (0.0, 10.0)]
+    assert feasible_polygons([[-1, 1, 2]], 10, 10, minim=True)[0] == expected
+    assert polygons_from_lines([[-1, 1, 2]], 10, 10, minim=True)[0] == expected
+    # a point where the face walk used to stop in the wrong face
+    arrangement = Arrangement([(3, 1, -22), (3, 0, -3), (-3, 5, -13), (1, 0, -20), (0, 1, -10), (1, 0, 0), (0, 1, 0)])
+    assert arrangement.face_containing((14.9, 8.37)) == arrangement.scan((14.9, 8.37)) == 5
+
+    # bottom face of the arrangement vs half-plane intersection on larger
+    # constraint sets
+    import random, time
+    rd = random.Random(0)
+    for n in [50, 100, 200]:
+        lines = [[rd.randint(1, 50), rd.randint(1, 50), rd.randint(500, 2000)] for _ in range(n)]
+        t = time.perf_counter()
+        arrangement = Arrangement([(a, b, -c) for a, b, c in lines] + [(1, 0, -100), (0, 1, -100), (1, 0, 0), (0, 1, 0)])
+        old = convex_hull(arrangement.polygons[arrangement.bottom_face()])
+        t_old = time.perf_counter()-t
+        t = time.perf_counter()
+        new = feasible_polygons(lines, 100, 100, minim=False)
+        t_new = time.perf_counter()-t
+        assert old == new[0]
+        print(f"n={n} arrangement={t_old:.3f}s feasible_polygons={t_new*1e3:.2f}ms x{t_old/t_new:.0f}")
+
+    # one arrangement, many queries
+    full = [(a, b, -c) for a, b, c in lines] + [(1, 0, -100), (0, 1, -100), (1, 0, 0), (0, 1, 0)]
+    t = time.perf_counter()
+    arrangement = Arrangement(full)
+    t_build = time.perf_counter()-t
+    points = [(rd.uniform(0, 100), rd.uniform(0, 100)) for _ in range(1000)]
+    t = time.perf_counter()
+    for p in points:
+        arrangement.face_containing(p)
+    t_query = (time.perf_counter()-t)/len(points)
+    t = time.perf_counter()
+    assert [arrangement.face_containing(p) for p in points] == [arrangement.scan(p) for p in points]
+    t_scan = (time.perf_counter()-t)/len(points)-t_query
+    print(f"Arrangement n={len(full)} {arrangement.stats()} build={t_build:.3f}s "
+          f"face_containing={t_query*1e6:.1f}us scan={t_scan*1e6:.1f}us")
+
+    # lines that go on past the box leave notches between the bounded faces,
+    # the walk must agree with scan() on every point of the box anyway
+    for _ in range(100):
+        full = [(rd.randint(-5, 5), rd.randint(-5, 5), rd.randint(-30, 30)) for _ in range(8)]
+        full = [l for l in full if l[0] or l[1]]
+        arrangement = Arrangement(full + [(1, 0, -20), (0, 1, -10), (1, 0, 0), (0, 1, 0)])
+        for _ in range(20):
+            p = (rd.uniform(0, 20), rd.uniform(0, 10))
+            assert arrangement.face_containing(p) == arrangement.scan(p)
+    print("face_containing == scan inside the box")
@@ -0,0 +1,143 @@
+import math
+from fractions import Fraction
+from solver import Unbounded, Infeasible, dense_row
+
+# Presolve for SimplexSolver programmes ({"function":..., "contraintes":...},
+# maximize f.x subject to a.x <= b and x >= 0).
+# The reduced programme keeps the original indices of its variables and rows
+# under "variables" and "rows" so firstTable labels X_{i}/e_{i} still refer to
+# the original model, and Presolve.postsolve maps a solution back.
+
+
+class Presolve:
+    """Reduces a programme and records how to undo it.
+
+    Reductions, repeated until nothing changes:
+    - empty rows and rows with only nonpositive coefficients and b >= 0 are
+      redundant;
+    - a singleton row a*x_j <= 0 with a > 0 fixes x_j at 0;
+    - duplicate rows (equal up to a positive factor) keep the tightest rhs;
+    - empty columns and dominated columns (c_j <= 0, every a_ij >= 0) are
+      fixed at 0.
+    Only columns with the default bounds [0, None] take part in the sign
+    based reductions; other "bounds" are passed on (scaled) to the result.
+    With scale=True rows and columns are then equilibrated (geometric mean,
+    rounded to powers of two) for the float engines.
+    """
+
+    def __init__(self, programme, scale=False):
+        f = list(programme['function'])
+        rows = [(list(dense_row(a, len(f))), b) for a, b in programme['contraintes']]
+        self.n = len(f)
+        self.m = len(rows)
+        bounds = programme.get('bounds') or [[0, None]]*self.n
+        # the sign arguments below assume 0 <= x_j, only bounded columns are
+        # kept as they are
+        free = {j for j, (lo, hi) in enumerate(bounds) if lo == 0 and hi is None}
+        keep_vars = set(range(self.n))
+        keep_rows = set(range(self.m))
+        self.removed = {'rows': [], 'variables': []}
+
+        changed = True
+        while changed:
+            changed = False
+            # rows
+            seen = {}
+            for i in sorted(keep_rows):
+                a, b = rows[i]
+                nz = [j for j in keep_vars if a[j]]
+                if not nz:
+                    if b < 0:
+                        raise Infeasible(f"row {i+1} reads 0 <= {b}")
+                    self._drop_row(keep_rows, i, 'empty')
+                    changed = True
+                    continue
+                if b >= 0 and all(a[j] < 0 and j in free for j in nz):
+                    self._drop_row(keep_rows, i, 'redundant')
+                    changed = True
+                    continue
+                if len(nz) == 1 and nz[0] in free and a[nz[0]] > 0 and b <= 0:
+                    if b < 0:
+                        raise Infeasible(f"row {i+1} forces X_{{{nz[0]+1}}} < 0")
+                    keep_vars.discard(nz[0])
+                    self.removed['variables'].append((nz[0], 'singleton row'))
+                    self._drop_row(keep_rows, i, 'singleton')
+                    changed = True
+                    continue
+                lead = abs(Fraction(a[nz[0]]))
+                key = tuple((j, Fraction(a[j])/lead) for j in sorted(nz))
+                rhs = Fraction(b)/lead
+                if key in seen:
+                    k, krhs = seen[key]
+                    if rhs < krhs:
+                        seen[key] = (i, rhs)
+                        self._drop_row(keep_rows, k, 'duplicate')
+                    else:
+                        self._drop_row(keep_rows, i, 'duplicate')
+                    changed = True
+                    continue
+                seen[key] = (i, rhs)
+            # columns: a column that can grow in every row only proves
+            # unboundedness once some point is feasible, here the lower bounds
+            low = all(sum(rows[i][0][j]*bounds[j][0] for j in keep_vars) <= rows[i][1] for i in keep_rows)
+            for j in sorted(keep_vars & free):
+                col = [rows[i][0][j] for i in keep_rows]
+                if low and all(v <= 0 for v in col) and f[j] > 0:
+                    raise Unbounded(f"X_{{{j+1}}} can grow without bound")
+                if f[j] <= 0 and all(v >= 0 for v in col):
+                    keep_vars.discard(j)
+                    self.removed['variables'].append((j, 'empty' if not any(col) else 'dominated'))
+                    changed = True
+
+        self.variables = sorted(keep_vars)
+        self.rows = sorted(keep_rows)
+        self.col_scale = [1]*len(self.variables)
+        self.row_scale = [1]*len(self.rows)
+        A = [[rows[i][0][j] for j in self.variables] for i in self.rows]
+        if scale and A and self.variables:
+            self._equilibrate(A)
+        self.programme = {
+            'function': [f[j]*s for j, s in zip(self.variables, self.col_scale)],
+            'contraintes': [
+                [[v*r*s for v, s in zip(A[k], self.col_scale)], rows[i][1]*r]
+                for k, (i, r) in enumerate(zip(self.rows, self.row_scale))
+            ],
+            'variables': self.variables,
+            'rows': self.rows,
+        }
+        if programme.get('bounds'):
+            self.programme['bounds'] = [
+                [Fraction(lo)/s, None if hi is None else Fraction(hi)/s] if s != 1 else [lo, hi]
+                for (lo, hi), s in zip((bounds[j] for j in self.variables), self.col_scale)
+            ]
+
+    def _drop_row(self, keep_rows, i, reason):
+        keep_rows.discard(i)
+        self.removed['rows'].append((i, reason))
+
+    def _equilibrate(self, A, passes=4):
+        def pow2(x):
+            return 2.0**round(math.log2(x))
+        for _ in range(passes):
+            for k, row in enumerate(A):
+                nz = [abs(v*s) for v, s in zip(row, self.col_scale) if v]
+                if nz:
+                    self.row_scale[k] = pow2(1/math.sqrt(max(nz)*min(nz)))
+            for j in range(len(self.variables)):
+                nz = [abs(row[j]*r) for row, r in zip(A, self.row_scale) if row[j]]
+                if nz:
+                    self.col_scale[j] = pow2(1/math.sqrt(max(nz)*min(nz)))
+
+    def postsolve(self, x):
+        """Map the reduced solution back to the n original variables."""
+        orig = [0]*self.n
+        for j, v, s in zip(self.variables, x, self.col_scale):
+            orig[j] = v*s
+        return orig
+
+    def stats(self):
+        return {
+            'rows': (self.m, len(self.rows)),
+            'variables': (self.n, len(self.variables)),
+            'removed': self.removed,
+        }
@@ -0,0 +1,384 @@
+import gzip
+import re
+import time
+from fractions import Fraction
+
+# Readers for free-format MPS and CPLEX LP files.
+# Files are read line by line and every constraint is kept as a sparse row
+# {column: value}, which SimplexSolver accepts as it is (see solver.dense_row),
+# so a model is never held as nested lists of zeros before the solver builds
+# its first table.
+#
+# The result is a SimplexSolver programme: maximize f.x with a.x <= b rows.
+# >= rows are negated, = rows and ranges become two rows, a minimized
+# objective is negated (programme['sense'] tells which). Finite variable
+# bounds go to programme['bounds'] and integer columns to
+# programme['integer'] (0-based, for BranchAndBound(integer=...)); names
+# are kept under programme['names']. Constant terms (objective offsets) are
+# rejected with a ValueError rather than dropped.
+
+
+def number(s):
+    """int when the text is integral, else an exact Fraction."""
+    try:
+        return int(s)
+    except ValueError:
+        return Fraction(s)
+
+
+class _Reader:
+
+    def __init__(self, source, number=number):
+        self.number = number
+        self.columns = {}
+        self.cost = {}
+        self.lines = 0
+        self.bytes = 0
+        start = time.perf_counter()
+        if hasattr(source, 'read'):
+            self.parse(self._lines(source))
+        else:
+            opener = gzip.open if str(source).endswith('.gz') else open
+            with opener(source, 'rt') as f:
+                self.parse(self._lines(f))
+        self.programme = self.build()
+        self.time = time.perf_counter()-start
+
+    def _lines(self, f):
+        for line in f:
+            self.lines += 1
+            self.bytes += len(line)
+            yield line
+
+    def column(self, name):
+        j = self.columns.get(name)
+        if j is None:
+            j = self.columns[name] = len(self.columns)
+        return j
+
+    def constraint(self, name, row, sense, rhs, rng=None):
+        """Append row `sense` rhs (sense in 'L', 'G', 'E') as <= rows, with an
+        optional MPS range."""
+        if rng is not None:
+            if sense == 'E':
+                lo, hi = (rhs, rhs+rng) if rng > 0 else (rhs+rng, rhs)
+            elif sense == 'L':
+                lo, hi = rhs-abs(rng), rhs
+            else:
+                lo, hi = rhs, rhs+abs(rng)
+        else:
+            lo = rhs if sense in 'GE' else None
+            hi = rhs if sense in 'LE' else None
+        if hi is not None:
+            self.rows.append([dict(row), hi])
+            self.names.append(name)
+        if lo is not None:
+            self.rows.append([{j: -v for j, v in row.items()}, -lo])
+            self.names.append(name)
+
+    def build(self):
+        n = len(self.columns)
+        sign = -1 if self.sense == 'min' else 1
+        programme = {
+            'function': [sign*self.cost.get(j, 0) for j in range(n)],
+            'contraintes': self.rows,
+            'sense': self.sense,
+            'names': {'variables': list(self.columns), 'rows': self.names},
+        }
+        bounds = [self.bounds.get(j, [0, None]) for j in range(n)]
+        for j, (lo, hi) in enumerate(bounds):
+            if lo is None:
+                raise ValueError(f"{list(self.columns)[j]} has no finite lower bound")
+        if any(b != [0, None] for b in bounds):
+            programme['bounds'] = bounds
+        if self.integer:
+            programme['integer'] = sorted(self.integer)
+        return programme
+
+    def stats(self):
+        return {
+            'lines': self.lines,
+            'bytes': self.bytes,
+            'rows': len(self.rows),
+            'variables': len(self.columns),
+            'nonzeros': sum(len(row) for row, _ in self.rows),
+            'time': self.time,
+            'lines_per_second': self.lines/self.time if self.time else 0,
+            'mb_per_second': self.bytes/1e6/self.time if self.time else 0,
+        }
+
+
+class MPSReader(_Reader):
+    """Free-format MPS: NAME, OBJSENSE, ROWS, COLUMNS (with integer MARKERs),
+    RHS, RANGES, BOUNDS, ENDATA. Objective rhs and free variables are not
+    supported."""
+
+    def parse(self, lines):
+        self.sense = 'min'
+        self.rows, self.names = [], []
+        self.bounds = {}
+        self.integer = set()
+        kinds = {}
+        coeffs = {}
+        rhs = {}
+        ranges = {}
+        objective = None
+        section = None
+        integer = False
+        for line in lines:
+            if not line.strip() or line[0] == '*':
+                continue
+            words = line.split()
+            if not line[0].isspace():
+                section = words[0].upper()
+                if section == 'OBJSENSE' and len(words) > 1:
+                    self.sense = 'max' if words[1].upper().startswith('MAX') else 'min'
+                continue
+            if section == 'OBJSENSE':
+                self.sense = 'max' if words[0].upper().startswith('MAX') else 'min'
+            elif section == 'ROWS':
+                kind, name = words[0].upper(), words[1]
+                if kind == 'N':
+                    if objective is None:
+                        objective = name
+                    continue
+                kinds[name] = kind
+                coeffs[name] = {}
+            elif section == 'COLUMNS':
+                if len(words) > 2 and words[1].upper() == "'MARKER'":
+                    integer = words[2].upper() == "'INTORG'"
+                    continue
+                j = self.column(words[0])
+                if integer:
+                    self.integer.add(j)
+                for name, value in zip(words[1::2], words[2::2]):
+                    if name == objective:
+                        self.cost[j] = self.number(value)
+                    elif name in coeffs:
+                        coeffs[name][j] = self.number(value)
+            elif section in ('RHS', 'RANGES'):
+                target = rhs if section == 'RHS' else ranges
+                pairs = words[1:] if len(words) % 2 else words
+                for name, value in zip(pairs[::2], pairs[1::2]):
+                    if name in coeffs:
+                        target[name] = self.number(value)
+            elif section == 'BOUNDS':
+                self.bound(words)
+        for name, kind in kinds.items():
+            self.constraint(name, coeffs[name], kind, rhs.get(name, 0), ranges.get(name))
+
+    def bound(self, words):
+        kind = words[0].upper()
+        j = self.column(words[2])
+        value = self.number(words[3]) if len(words) > 3 else None
+        lo, hi = self.bounds.get(j, [0, None])
+        if kind == 'UP':
+            hi = value
+        elif kind == 'LO':
+            lo = value
+        elif kind == 'FX':
+            lo = hi = value
+        elif kind == 'PL':
+            hi = None
+        elif kind == 'BV':
+            lo, hi = 0, 1
+            self.integer.add(j)
+        elif kind == 'LI':
+            lo = value
+            self.integer.add(j)
+        elif kind == 'UI':
+            hi = value
+            self.integer.add(j)
+        elif kind in ('MI', 'FR'):
+            lo = None
+        else:
+            raise ValueError(f"unsupported bound type {kind}")
+        self.bounds[j] = [lo, hi]
+
+
+_TOKEN = re.compile(r"""
+    (?P<op><=|=<|>=|=>|<|>|=)
+  | (?P<num>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<sign>[+-])
+  | (?P<colon>:)
+  | (?P<name>[A-Za-z_!"\#$%&()/,.;?@`'{}|~][\w!"\#$%&()/,.;?@`'{}|~\[\]^]*)
+""", re.VERBOSE)
+
+_SECTIONS = {
+    'maximize': 'max', 'maximise': 'max', 'maximum': 'max', 'max': 'max',
+    'minimize': 'min', 'minimise': 'min', 'minimum': 'min', 'min': 'min',
+    'subject to': 'st', 'such that': 'st', 'st': 'st', 's.t.': 'st',
+    'bounds': 'bounds', 'bound': 'bounds',
+    'general': 'int', 'generals': 'int', 'gen': 'int', 'integer': 'int', 'integers': 'int',
+    'binary': 'bin', 'binaries': 'bin', 'bin': 'bin',
+    'end': 'end',
+}
+
+_INF = ('inf', 'infinity')
+
+
+class LPReader(_Reader):
+    """CPLEX LP format: objective, Subject To, Bounds, General/Integer,
+    Binary and End sections, '\\' comments. Statements may span lines;
+    free variables and quadratic terms are not supported."""
+
+    def parse(self, lines):
+        self.sense = None
+        self.rows, self.names = [], []
+        self.bounds = {}
+        self.integer = set()
+        section = None
+        tokens = []
+        for line in lines:
+            line = line.split('\\', 1)[0]
+            key = line.strip().lower()
+            if key in _SECTIONS:
+                self.flush(section, tokens)
+                tokens = []
+                section = _SECTIONS[key]
+                if section in ('max', 'min'):
+                    self.sense = section
+                continue
+            line_tokens = [(m.lastgroup, m.group()) for m in _TOKEN.finditer(line)]
+            if section == 'bounds':
+                # one bound per line
+                if line_tokens:
+                    self.bound(line_tokens)
+                continue
+            tokens += line_tokens
+            if section == 'st':
+                tokens = self.rows_from(tokens)
+        self.flush(section, tokens)
+        if self.sense is None:
+            raise ValueError("no objective section")
+
+    def flush(self, section, tokens):
+        if section in ('max', 'min'):
+            self.cost, _ = self.expression(tokens)
+        elif section == 'st':
+            if self.rows_from(tokens):
+                raise ValueError(f"incomplete constraint {' '.join(v for _, v in tokens)}")
+        elif section in ('int', 'bin'):
+            for kind, name in tokens:
+                j = self.column(name)
+                self.integer.add(j)
+                if section == 'bin':
+                    self.bounds[j] = [0, 1]
+
+    def rows_from(self, tokens):
+        """Add every complete constraint of tokens (they end with the number
+        after their relation), return the remaining tokens."""
+        start = 0
+        for i, (kind, _) in enumerate(tokens):
+            if kind != 'op':
+                continue
+            j = i+1
+            if j < len(tokens) and tokens[j][0] == 'sign':
+                j += 1
+            if j >= len(tokens):
+                break
+            self.row(tokens[start:j+1])
+            start = j+1
+        return tokens[start:]
+
+    def expression(self, tokens):
+        """Linear expression -> ({column: coefficient}, label or None)."""
+        label = None
+        if len(tokens) > 1 and tokens[1][0] == 'colon':
+            label = tokens[0][1]
+            tokens = tokens[2:]
+        row = {}
+        coef = 1
+        pending = None
+        for kind, value in [*tokens, ('sign', '+')]:
+            if pending is not None and kind != 'name':
+                # a number with no variable: programmes have no constant term
+                raise ValueError(f"unsupported constant term {coef*pending} in {label or 'expression'}")
+            if kind == 'sign':
+                coef = -coef if value == '-' else coef
+            elif kind == 'num':
+                pending = self.number(value)
+            elif kind == 'name':
+                j = self.column(value)
+                row[j] = row.get(j, 0)+coef*(1 if pending is None else pending)
+                coef, pending = 1, None
+        return row, label
+
+    def value(self, tokens):
+        sign = -1 if tokens[0][1] == '-' else 1
+        kind, value = tokens[-1]
+        if value.lower() in _INF:
+            return sign*float('inf')
+        return sign*self.number(value)
+
+    def row(self, tokens):
+        k = next(i for i, (kind, _) in enumerate(tokens) if kind == 'op')
+        row, label = self.expression(tokens[:k])
+        op = tokens[k][1]
+        sense = 'L' if '<' in op else 'G' if '>' in op else 'E'
+        self.constraint(label or f'R{len(self.names)+1}', row, sense, self.value(tokens[k+1:]))
+
+    def bound(self, tokens):
+        names = [(i, v) for i, (kind, v) in enumerate(tokens) if kind == 'name' and v.lower() not in _INF + ('free',)]
+        i, name = names[0]
+        j = self.column(name)
+        lo, hi = self.bounds.get(j, [0, None])
+        if tokens[-1][1].lower() == 'free':
+            lo, hi = None, None
+        ops = [k for k, (kind, _) in enumerate(tokens) if kind == 'op']
+        for k in ops:
+            op = tokens[k][1]
+            if k > i:
+                v = self.value(tokens[k+1:])
+                if '<' in op:
+                    hi = v
+                elif '>' in op:
+                    lo = v
+                else:
+                    lo = hi = v
+            else:
+                v = self.value(tokens[:k])
+                if '<' in op:
+                    lo = v
+                elif '>' in op:
+                    hi = v
+                else:
+                    lo = hi = v
+        lo = None if lo == -float('inf') else lo
+        hi = None if hi == float('inf') else hi
+        self.bounds[j] = [lo, hi]
+
+
+def read_mps(source, number=number):
+    return MPSReader(source, number).programme
+
+
+def read_lp(source, number=number):
+    return LPReader(source, number).programme
+
+
+if __name__ == "__main__":
+    # parse vs solve time on generated sparse MPS files of growing size
+    import os
+    import random
+    import tempfile
+    from solver import SimplexSolver
+    rd = random.Random(0)
+    for m, n in [(100, 200), (300, 600), (1000, 2000)]:
+        path = os.path.join(tempfile.mkdtemp(), 'bench.mps')
+        with open(path, 'w') as f:
+            f.write("NAME BENCH\nOBJSENSE\n    MAX\nROWS\n N obj\n")
+            f.writelines(f" L r{i}\n" for i in range(m))
+            f.write("COLUMNS\n")
+            for j in range(n):
+                f.write(f"    x{j} obj {rd.randint(1, 20)}\n")
+                for i in sorted(rd.sample(range(m), 3)):
+                    f.write(f"    x{j} r{i} {rd.randint(1, 9)}\n")
+            f.write("RHS\n")
+            f.writelines(f"    rhs r{i} {rd.randint(10, 100)}\n" for i in range(m))
+            f.write("ENDATA\n")
+        reader = MPSReader(path)
+        s = reader.stats()
+        solver = SimplexSolver(reader.programme, engine='float', history=False)
+        print(f"m={m} n={n} parse={s['time']:.4f}s ({s['mb_per_second']:.1f} MB/s, {s['nonzeros']} nnz) "
+              f"solve={solver.time:.3f}s z={solver.solution()['z']:.4f}")
@@ -0,0 +1,252 @@
+from itertools import chain
+import numpy as np
+from tableau import SparseTable
+
+# Revised simplex engine for SimplexSolver (engine='revised').
+# The constraint matrix from the first table is never modified (complemented
+# columns only flip an entry of a sign vector): the basis inverse is kept as
+# B^-1 from LAPACK at the last refactorization plus a product-form eta file,
+# and reduced costs / columns are computed on demand, so FTRAN and BTRAN
+# are matrix-vector products followed by the eta file.
+#
+# Columns with at most one nonzero (the slacks of the first table) are kept
+# implicit as (row, value), only the other columns are stored, as one
+# column-major array N.
+
+
+class RevisedTableau:
+    """Same interface as the tableau engines of tableau.py.
+
+    `refactor` is the number of eta updates kept before B is factorized again.
+    """
+
+    sparse_table = True
+
+    def __init__(self, table, tol=1e-9, refactor=50):
+        if isinstance(table, SparseTable):
+            self._from_rows(table)
+        else:
+            self.header = list(table[0])
+            self.labels = [row[0] for row in table[1:-1]]
+            M = np.array([row[1:] for row in table[1:]], dtype=np.float64)
+            A = M[:-1, :-1]
+            self.b = M[:-1, -1].copy()
+            self.c = M[-1, :-1].copy()
+            self.z0 = M[-1, -1]
+            self.m, self.n = A.shape
+            # (with no rows every column is an empty dense one)
+            single = (np.count_nonzero(A, axis=0) <= 1) & (self.m > 0)
+            self.dense = np.flatnonzero(~single)
+            self.single = np.flatnonzero(single)
+            self.N = np.asfortranarray(A[:, self.dense])
+            self.srow = np.argmax(A[:, self.single] != 0, axis=0) if self.m else self.single
+            self.sval = A[self.srow, self.single]
+        # position of column j in N, or in srow/sval (~k) for a singleton
+        self.pos = np.empty(self.n, dtype=np.intp)
+        self.pos[self.dense] = np.arange(len(self.dense))
+        self.pos[self.single] = ~np.arange(len(self.single))
+        # -1 for the columns complemented by flip()
+        self.sign = np.ones(self.n)
+        self.tol = tol
+        self.refactor = refactor
+        self.basis = [self.header.index(label)-1 for label in self.labels]
+        self._alpha = None
+        self.factorize()
+
+    def _from_rows(self, table):
+        """Same fields as above, from the nonzeros of a SparseTable."""
+        self.header = list(table.header)
+        self.labels = list(table.labels)
+        self.m, self.n = len(self.labels), table.n
+        self.b = np.array([float(d.get(self.n, 0)) for d in table.rows[:-1]])
+        z = table.rows[-1]
+        self.c = np.zeros(self.n)
+        for j, v in z.items():
+            if j < self.n:
+                self.c[j] = v
+        self.z0 = float(z.get(self.n, 0))
+        rows = table.rows[:-1]
+        I = np.repeat(np.arange(self.m), [len(d) for d in rows])
+        J = np.fromiter(chain.from_iterable(rows), dtype=np.intp, count=len(I))
+        V = np.fromiter(chain.from_iterable(map(dict.values, rows)), dtype=np.float64, count=len(I))
+        keep = (J < self.n) & (V != 0)
+        I, J, V = I[keep], J[keep], V[keep]
+        single = (np.bincount(J, minlength=self.n) <= 1) & (self.m > 0)
+        self.dense = np.flatnonzero(~single)
+        self.single = np.flatnonzero(single)
+        where = np.empty(self.n, dtype=np.intp)
+        where[self.dense] = np.arange(len(self.dense))
+        where[self.single] = np.arange(len(self.single))
+        self.N = np.zeros((self.m, len(self.dense)), order='F')
+        self.srow = np.zeros(len(self.single), dtype=np.intp)
+        self.sval = np.zeros(len(self.single))
+        s = single[J]
+        self.N[I[~s], where[J[~s]]] = V[~s]
+        self.srow[where[J[s]]] = I[s]
+        self.sval[where[J[s]]] = V[s]
+
+    def columns(self, cols):
+        """Dense m x len(cols) array of the columns `cols` (0-based)."""
+        cols = np.asarray(cols, dtype=np.intp)
+        out = np.zeros((self.m, len(cols)))
+        k = self.pos[cols]
+        dense = k >= 0
+        out[:, dense] = self.N[:, k[dense]]
+        s = ~k[~dense]
+        out[self.srow[s], np.flatnonzero(~dense)] = self.sval[s]
+        return out*self.sign[cols]
+
+    def tmul(self, v):
+        """v @ A over every column."""
+        out = np.empty(self.n)
+        out[self.dense] = v @ self.N
+        out[self.single] = v[self.srow]*self.sval
+        return out*self.sign
+
+    def factorize(self):
+        self.inverse = np.linalg.inv(self.columns(self.basis))
+        self.etas = []
+        self.xB = self.ftran(self.b)
+
+    def ftran(self, v):
+        x = self.inverse @ v
+        for r, eta in self.etas:
+            xr = x[r]/eta[r]
+            x -= np.multiply.outer(eta, xr)
+            x[r] = xr
+        return x
+
+    def btran(self, v):
+        w = np.array(v, dtype=np.float64)
+        for r, eta in reversed(self.etas):
+            w[r] = (w[r] - w @ eta + w[r]*eta[r])/eta[r]
+        return w @ self.inverse
+
+    def duals(self):
+        return self.btran(self.c[self.basis])
+
+    def reduced_costs(self, cols=None):
+        y = self.duals()
+        if cols is None:
+            return self.c - self.tmul(y)
+        return self.c[cols] - y @ self.columns(cols)
+
+    def entering(self):
+        d = self.reduced_costs()
+        if not len(d):
+            return None
+        j = int(np.argmax(d))
+        if d[j] <= self.tol:
+            return None
+        return j+1
+
+    def column(self, col):
+        if self._alpha is None or self._alpha[0] != col:
+            self._alpha = (col, self.ftran(self.columns([col-1])[:, 0]))
+        return self._alpha[1]
+
+    def row(self, row):
+        e = np.zeros(self.m)
+        e[row-1] = 1
+        return self.tmul(self.btran(e))
+
+    def basic_index(self, i):
+        return self.basis[i]+1
+
+    def objective(self):
+        return float(self.c[self.basis] @ self.xB - self.z0)
+
+    def leaving(self, col, bland=False):
+        a = self.column(col)
+        mask = a > self.tol
+        if not mask.any():
+            return None
+        ratios = np.full(a.shape, np.inf)
+        np.divide(np.maximum(self.xB, 0), a, out=ratios, where=mask)
+        i = int(np.argmin(ratios))
+        if bland:
+            ties = np.flatnonzero(ratios <= ratios[i]+self.tol)
+            i = min(ties.tolist(), key=self.basic_index)
+        return i+1
+
+    def dual_leaving(self):
+        if not self.m:
+            return None
+        i = int(np.argmin(self.xB))
+        if self.xB[i] >= -self.tol:
+            return None
+        return i+1
+
+    def dual_entering(self, row, upper=False):
+        a = self.row(row)*(-1 if upper else 1)
+        mask = a < -self.tol
+        mask[self.basis[row-1]] = False
+        if not mask.any():
+            return None
+        ratios = np.full(a.shape, np.inf)
+        np.divide(np.minimum(self.reduced_costs(), 0), a, out=ratios, where=mask)
+        return int(np.argmin(ratios))+1
+
+    def column_exact(self, col):
+        return self.column(col)
+
+    def rhs_exact(self):
+        return self.xB
+
+    def flip(self, col, u):
+        j = col-1
+        u = float(u)
+        self.xB -= u*self.column(col)
+        self.b -= u*self.columns([j])[:, 0]
+        self.z0 -= u*self.c[j]
+        self.sign[j] = -self.sign[j]
+        self.c[j] *= -1
+        self._alpha = None
+
+    def pivot(self, row, col):
+        r = row-1
+        a = self.column(col)
+        theta = self.xB[r]/a[r]
+        self.xB -= theta*a
+        self.xB[r] = theta
+        self.basis[r] = col-1
+        self.labels[r] = self.header[col]
+        self._alpha = None
+        self.etas.append((r, a))
+        if len(self.etas) >= self.refactor:
+            self.factorize()
+
+    def snapshot(self):
+        inverse = self.ftran(np.eye(self.m))
+        T = np.empty((self.m, self.n))
+        T[:, self.dense] = inverse @ self.N
+        T[:, self.single] = inverse[:, self.srow]*self.sval
+        T *= self.sign
+        z = self.reduced_costs()
+        cB = self.c[self.basis]
+        lis = [list(self.header)]
+        for i, row in enumerate(T.tolist()):
+            lis.append([self.labels[i], *row, float(self.xB[i])])
+        lis.append(['Z', *z.tolist(), float(self.z0 - cB @ self.xB)])
+        return lis
+
+
+if __name__ == "__main__":
+    # wide programmes (n >> m): the float engine updates the whole
+    # (m+1) x (n+m+1) tableau at every pivot, the revised one prices N once
+    # and stores no slack column
+    import time
+    from bench import dense
+    from solver import SimplexSolver
+    for m, n in [(30, 1000), (60, 3000), (100, 5000), (100, 20000), (200, 20000)]:
+        programme = dense(m, n, 1)
+        line = [f"m={m} n={n}"]
+        for engine in ['float', 'revised']:
+            s = SimplexSolver(programme, engine=engine, history=False, solve=False)
+            table = s.firstTable(s.sparse_input())
+            start = time.perf_counter()
+            s.tables = s.record(s.steps(s.checkpoint_every(), table))
+            t = time.perf_counter()-start
+            size = s.tableau.N.nbytes if engine == 'revised' else s.tableau.t.nbytes
+            line.append(f"{engine}={t:.3f}s/{size/2**20:.1f}MB({s.iterations}it z={float(s.solution()['z']):.6f})")
+        print(" ".join(line))
@@ -0,0 +1,93 @@
+import numpy as np
+
+# Sensitivity analysis read off the final table of a SimplexSolver
+# (solver.tables[-1]['table']): reduced costs, shadow prices and the ranges
+# over which an objective coefficient or a right-hand side can move while the
+# final basis stays optimal. Everything is a few array operations on the
+# m x (n+m) table, nothing is solved again.
+
+
+def _unpack(table, exact):
+    dtype = object if exact else np.float64
+    header = table[0]
+    labels = [row[0] for row in table[1:-1]]
+    M = np.array([row[1:] for row in table[1:]], dtype=dtype)
+    if not exact:
+        M = M.astype(np.float64)
+    return header[1:-1], labels, M[:-1, :-1], M[:-1, -1], M[-1, :-1]
+
+
+def _ranges(ratio, mask_low, mask_high, axis):
+    """Per row (axis=1) or column (axis=0): max of ratio where mask_low, min where mask_high."""
+    inf = float('inf')
+    low = np.where(mask_low, ratio, -inf).max(axis=axis, initial=-inf)
+    high = np.where(mask_high, ratio, inf).min(axis=axis, initial=inf)
+    return low, high
+
+
+def _index(label):
+    return int(label[3:-1])-1
+
+
+def sensitivity(table, programme=None, exact=False):
+    """Sensitivity of the optimal basis of `table`.
+
+    Returns a dict of arrays indexed like 'variables' (the X_{j} columns) and
+    'constraints' (the e_{i} columns):
+    - 'values': optimal value of every variable;
+    - 'reduced_costs': Z row entry of every variable (0 when basic);
+    - 'shadow_prices': dual value of every constraint;
+    - 'slacks': value of every slack;
+    - 'objective_ranges': [low, high] per variable;
+    - 'rhs_ranges': [low, high] per constraint.
+    The ranges are absolute when the programme is given, otherwise they are
+    the allowed decrease/increase around the current value (±inf when
+    unlimited). With exact=True the arrays hold the table's own Fractions.
+    Bounded or flipped variables are not taken into account.
+    """
+    header, labels, T, b, d = _unpack(table, exact)
+    tol = 0 if exact else 1e-9
+    cols = {label: k for k, label in enumerate(header)}
+    xcols = [k for k, label in enumerate(header) if label.startswith('X_')]
+    ecols = [k for k, label in enumerate(header) if label.startswith('e_')]
+    basic = np.array([cols[label] for label in labels], dtype=int)
+    is_basic = np.zeros(len(header), dtype=bool)
+    is_basic[basic] = True
+    values = np.zeros(len(header), dtype=T.dtype)
+    values[basic] = b
+
+    # objective: a nonbasic d_j <= 0 may rise up to 0; a basic c_j moving by
+    # delta shifts every nonbasic d_k by -delta*T[r,k]
+    nonbasic = np.flatnonzero(~is_basic)
+    R = T[:, nonbasic]
+    ratio = d[nonbasic]/np.where(R != 0, R, 1)
+    low_b, high_b = _ranges(ratio, R > tol, R < -tol, axis=1)
+    inf = float('inf')
+    obj = np.empty((len(header), 2), dtype=object if exact else np.float64)
+    obj[:, 0] = -inf
+    obj[:, 1] = -d
+    obj[basic, 0] = low_b
+    obj[basic, 1] = high_b
+
+    # right-hand side: b_i moving by delta moves x_B by delta*T[:, e_i]
+    S = T[:, ecols]
+    ratio = -b[:, None]/np.where(S != 0, S, 1)
+    low_r, high_r = _ranges(ratio, S > tol, S < -tol, axis=0)
+    rhs = np.stack([low_r, high_r], axis=1)
+
+    if programme is not None:
+        f = programme['function']
+        sc = programme['contraintes']
+        obj[xcols] += np.array([[f[_index(header[k])]]*2 for k in xcols], dtype=obj.dtype)
+        rhs += np.array([[sc[_index(header[k])][1]]*2 for k in ecols], dtype=rhs.dtype)
+
+    return {
+        'variables': [header[k] for k in xcols],
+        'constraints': [header[k] for k in ecols],
+        'values': values[xcols],
+        'reduced_costs': d[xcols],
+        'shadow_prices': -d[ecols],
+        'slacks': values[ecols],
+        'objective_ranges': obj[xcols],
+        'rhs_ranges': rhs,
+    }
@@ -0,0 +1,235 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from batch import solve_one
+
+# Local solve service: newline-delimited JSON over a Unix socket (or TCP on
+# localhost). Every line is a request
+#     {"id": ..., "programme": {...}, "engine": "fraction", "pivot_rule": "dantzig"}
+# answered, in completion order, by a line {"id": ..., **batch.solve_one(...)}
+# with Fractions written as "p/q" strings. The line {"stats": true} is
+# answered with the service metrics (queue depth, latencies).
+#
+# Requests from all connections go through one queue; the batcher takes what
+# arrived within `delay` seconds (at most `batch` requests) and splits it into
+# one chunk per worker, each sent to the process pool as one task, so tiny
+# programmes do not pay one IPC round trip each and a batch still uses every
+# worker.
+
+
+def _solve_batch(items):
+    return [solve_one(programme, engine, rule) for programme, engine, rule in items]
+
+
+def _number(v):
+    return Fraction(v) if isinstance(v, str) else v
+
+
+def _programme(p):
+    """Undo the JSON encoding: "p/q" strings back to Fractions, sparse row keys back to ints."""
+    def row(a):
+        if isinstance(a, dict):
+            return {int(j): _number(v) for j, v in a.items()}
+        return [_number(v) for v in a]
+    p = dict(p)
+    p['function'] = [_number(v) for v in p['function']]
+    p['contraintes'] = [[row(a), _number(b)] for a, b in p['contraintes']]
+    if p.get('bounds'):
+        p['bounds'] = [[_number(lo), None if hi is None else _number(hi)] for lo, hi in p['bounds']]
+    return p
+
+
+def _default(o):
+    if isinstance(o, Fraction):
+        return str(o)
+    if hasattr(o, 'item'):
+        return o.item()
+    return str(o)
+
+
+class SolveService:
+
+    def __init__(self, workers=None, batch=32, delay=0.005, window=1000):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch = batch
+        self.delay = delay
+        self.queue = None
+        self.pool = None
+        # run_batch tasks still waiting on the pool
+        self.tasks = set()
+        self.in_flight = 0
+        self.max_depth = 0
+        self.served = 0
+        self.batches = 0
+        self.latencies = deque(maxlen=window)
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.batcher = asyncio.create_task(self.run_batches())
+
+    async def stop(self):
+        self.batcher.cancel()
+        try:
+            await self.batcher
+        except asyncio.CancelledError:
+            pass
+        # shutdown() waits for the running chunks, off the event loop
+        await asyncio.to_thread(self.pool.shutdown)
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        while not self.queue.empty():
+            future, _ = self.queue.get_nowait()
+            if not future.done():
+                future.set_result({'status': 'error', 'error': 'service stopped'})
+
+    async def solve(self, programme, engine='fraction', pivot_rule='dantzig'):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((future, (programme, engine, pivot_rule)))
+        self.max_depth = max(self.max_depth, self.depth())
+        return await future
+
+    def depth(self):
+        return self.queue.qsize()+self.in_flight
+
+    async def run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            deadline = loop.time()+self.delay
+            while len(items) < self.batch:
+                timeout = deadline-loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.in_flight += len(items)
+            self.batches += 1
+            size = -(-len(items)//self.workers)
+            for i in range(0, len(items), size):
+                task = asyncio.create_task(self.run_batch(items[i:i+size]))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+
+    async def run_batch(self, items):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.pool, _solve_batch, [request for _, request in items])
+        except Exception as e:
+            results = [{'status': 'error', 'error': f'{type(e).__name__}: {e}'}]*len(items)
+        self.in_flight -= len(items)
+        for (future, _), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        lat = sorted(self.latencies)
+
+        def pct(p):
+            return lat[min(len(lat)-1, int(p*len(lat)))] if lat else None
+        return {
+            'queue_depth': self.depth(),
+            'max_queue_depth': self.max_depth,
+            'served': self.served,
+            'batches': self.batches,
+            'latency_mean': sum(lat)/len(lat) if lat else None,
+            'latency_p50': pct(0.5),
+            'latency_p95': pct(0.95),
+            'latency_p99': pct(0.99),
+        }
+
+    async def handle(self, reader, writer):
+        tasks = set()
+        lock = asyncio.Lock()
+
+        async def send(message):
+            async with lock:
+                writer.write(json.dumps(message, default=_default).encode()+b'\n')
+                await writer.drain()
+
+        async def answer(request, start):
+            try:
+                programme = _programme(request['programme'])
+            except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+                result = {'status': 'error', 'error': f'bad programme: {type(e).__name__}: {e}'}
+            else:
+                result = await self.solve(programme, request.get('engine', 'fraction'),
+                                          request.get('pivot_rule', 'dantzig'))
+            self.latencies.append(time.perf_counter()-start)
+            self.served += 1
+            await send({'id': request.get('id'), **result})
+
+        try:
+            while line := await reader.readline():
+                start = time.perf_counter()
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    await send({'status': 'error', 'error': f'bad request: {e}'})
+                    continue
+                if request.get('stats'):
+                    await send({'id': request.get('id'), 'stats': self.stats()})
+                    continue
+                if 'programme' not in request:
+                    await send({'id': request.get('id'), 'status': 'error', 'error': 'no programme'})
+                    continue
+                task = asyncio.create_task(answer(request, start))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+
+async def serve(path=None, port=None, **options):
+    service = SolveService(**options)
+    await service.start()
+    if path:
+        server = await asyncio.start_unix_server(service.handle, path=path)
+    else:
+        server = await asyncio.start_server(service.handle, host='127.0.0.1', port=port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+async def request(programmes, path=None, port=None, engine='fraction', pivot_rule='dantzig'):
+    """Send programmes to a running service, yield (index, result) as they come back."""
+    if path:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    count = 0
+    for i, programme in enumerate(programmes):
+        writer.write(json.dumps({'id': i, 'programme': programme, 'engine': engine, 'pivot_rule': pivot_rule},
+                                default=_default).encode()+b'\n')
+        count += 1
+    await writer.drain()
+    for _ in range(count):
+        result = json.loads(await reader.readline())
+        yield result.pop('id'), result
+    writer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Local SimplexSolver service.')
+    parser.add_argument('--socket', default='/tmp/simplex.sock', help='Unix socket path')
+    parser.add_argument('--port', type=int, help='listen on localhost:PORT instead of a socket')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--batch', type=int, default=32)
+    parser.add_argument('--delay', type=float, default=0.005)
+    args = parser.parse_args()
+    if args.port is None and os.path.exists(args.socket):
+        os.remove(args.socket)
+    asyncio.run(serve(None if args.port else args.socket, args.port,
+                      workers=args.workers, batch=args.batch, delay=args.delay))
@@ -0,0 +1,729 @@
+from tableau import FractionTableau, FloatTableau, SparseTableau, BareissTableau, SparseTable
+from revised import RevisedTableau
+from pivoting import make_rule
+from metrics import Metrics
+from history import History
+import copy,math,time
+from fractions import Fraction
+import numpy as np
+
+ENGINES = {
+    'fraction': FractionTableau,
+    'float': FloatTableau,
+    'sparse': SparseTableau,
+    'bareiss': BareissTableau,
+    'revised': RevisedTableau,
+    # float64 solve, then exact: see SimplexSolver.certified_table
+    'mixed': FractionTableau,
+}
+
+
+class Unbounded(Exception):
+    pass
+
+
+class Infeasible(Exception):
+    pass
+
+
+def dense_row(row,n):
+    """Coefficients of a constraint as a list, rows may also be given sparse
+    as {column: value} (see readers.py)."""
+    if isinstance(row,dict):
+        return [row.get(j,0) for j in range(n)]
+    return row
+
+
+class SimplexSolver:
+
+    def __init__(self,programme,engine='fraction',history=True,solve=True,pivot_rule='dantzig',presolve=False,basis=None,crash=False,on_pivot=None,metrics=False):
+        self.presolve=None
+        if presolve:
+            from presolve import Presolve
+            self.presolve=Presolve(programme,scale=engine in ('float','revised'))
+            programme=self.presolve.programme
+        self.programme=programme
+        self.engine=engine
+        self.basis=basis
+        # crash=True starts from crash_basis() instead of the slack basis
+        self.crash=crash and basis is None
+        self.pivot_rule=pivot_rule
+        self.rule=make_rule(pivot_rule)
+        # on_pivot(record) is called after every pivot, see metrics.Metrics;
+        # without it (and metrics=False) nothing is measured
+        self.metrics=Metrics(on_pivot) if on_pivot or metrics else None
+        self.iterations=0
+        self.time=0
+        # history=False only keeps the final table, engines such as 'revised'
+        # then never build the intermediate tableaux. Otherwise tables is a
+        # History keeping a full table every `history` steps (10 for True)
+        # and replaying the pivot log in between
+        self.history=history
+        self.tableau=None
+        self.upper={}
+        self.flipped=set()
+        self._pending=None
+        self._reprice=False
+        # engine='mixed': pivots of the float64 solve, and whether its basis
+        # was already optimal in exact arithmetic
+        self.float_iterations=None
+        self.certified=None
+        self.tables=[]
+        if solve:
+            self.tables=self.record(self.steps(self.checkpoint_every()))
+    
+    def checkpoint_every(self):
+        if self.history is True:
+            return 10
+        return int(self.history)
+
+    def record(self,steps):
+        if not self.history:
+            return [step for step in steps if step['table'] is not None]
+        return History(self,steps,self.checkpoint_every())
+
+    def sparse_input(self,engine=None):
+        """Whether the engine is built from firstTable(sparse=True)."""
+        return getattr(ENGINES[engine or self.engine],'sparse_table',False)
+
+    def make_tableau(self,table):
+        if isinstance(table,SparseTable) and not self.sparse_input():
+            table=table.dense()
+        return ENGINES[self.engine](table)
+
+    def get_pivot(self,tableau):
+        col_pivot=self.rule.entering(tableau)
+        if self.metrics:
+            self.metrics.lap('pricing')
+        if col_pivot is None:
+            return None
+        row_pivot=self.rule.leaving(tableau,col_pivot)
+        if self.metrics:
+            self.metrics.lap('ratio')
+        if row_pivot is None:
+            raise Unbounded(f"{tableau.header[col_pivot]} can grow without bound")
+        return [row_pivot,col_pivot]
+
+    def get_dual_pivot(self,tableau,bland=False):
+        if bland:
+            violated=self.violated_row(tableau,True)
+            row_pivot=violated and violated[0]
+        else:
+            row_pivot=tableau.dual_leaving()
+        if self.metrics:
+            self.metrics.lap('pricing')
+        if row_pivot is None:
+            return None
+        col_pivot=tableau.dual_entering(row_pivot)
+        if self.metrics:
+            self.metrics.lap('ratio')
+        if col_pivot is None:
+            raise Infeasible(f"{tableau.labels[row_pivot-1]} cannot be made nonnegative")
+        return [row_pivot,col_pivot]
+
+    # bounded variables: self.upper maps a column to its upper bound (after the
+    # lower bound shift of firstTable). A nonbasic column sitting at its upper
+    # bound is complemented (x = u - x') by tableau.flip, so every engine keeps
+    # working with nonbasic variables at 0 and no bound rows are needed.
+
+    def get_bounded_pivot(self,tableau):
+        """Ratio test with bound flipping: ([row,col] or None, columns to flip)."""
+        col_pivot=self.rule.entering(tableau)
+        if self.metrics:
+            self.metrics.lap('pricing')
+        if col_pivot is None:
+            return None,[]
+        a=tableau.column_exact(col_pivot)
+        b=tableau.rhs_exact()
+        tol=tableau.tol
+        best=self.upper.get(col_pivot)
+        row_pivot=None
+        at_upper=False
+        for i in range(len(a)):
+            if a[i]>tol:
+                theta=max(b[i],0)/a[i]
+                up=False
+            elif a[i]<-tol and tableau.basic_index(i) in self.upper:
+                theta=max(self.upper[tableau.basic_index(i)]-b[i],0)/-a[i]
+                up=True
+            else:
+                continue
+            if best is None or theta<best:
+                best,row_pivot,at_upper=theta,i+1,up
+        if self.metrics:
+            self.metrics.lap('ratio')
+        if best is None:
+            raise Unbounded(f"{tableau.header[col_pivot]} can grow without bound")
+        if row_pivot is None:
+            return None,[col_pivot]
+        return [row_pivot,col_pivot],[tableau.basic_index(row_pivot-1)] if at_upper else []
+
+    def violated_row(self,tableau,bland=False):
+        """Most violated basic variable as (row, above its upper bound), or None.
+        bland=True takes the violated basic variable of smallest index instead."""
+        if not self.upper and not bland:
+            row=tableau.dual_leaving()
+            return None if row is None else (row,False)
+        tol=tableau.tol
+        best=None
+        res=None
+        for i,v in enumerate(tableau.rhs_exact()):
+            j=tableau.basic_index(i)
+            u=self.upper.get(j)
+            if v<-tol:
+                key,up=-v,False
+            elif u is not None and v-u>tol:
+                key,up=v-u,True
+            else:
+                continue
+            if bland:
+                key=-j
+            if best is None or key>best:
+                best,res=key,(i+1,up)
+        return res
+
+    def get_bounded_dual_pivot(self,tableau,bland=False):
+        violated=self.violated_row(tableau,bland)
+        if self.metrics:
+            self.metrics.lap('pricing')
+        if violated is None:
+            return None,[]
+        row_pivot,at_upper=violated
+        col_pivot=tableau.dual_entering(row_pivot,upper=at_upper)
+        if self.metrics:
+            self.metrics.lap('ratio')
+        if col_pivot is None:
+            raise Infeasible(f"{tableau.labels[row_pivot-1]} cannot be brought within its bounds")
+        return [row_pivot,col_pivot],[tableau.basic_index(row_pivot-1)] if at_upper else []
+
+    def bounds(self):
+        n=len(self.programme['function'])
+        return self.programme.get('bounds') or [[0,None]]*n
+
+    def firstTable(self,sparse=False):
+        """Slack basis table; with sparse=True a SparseTable built from the
+        nonzeros of the rows, for the engines that take one."""
+        def line_helper(line,ind,n):
+            lis=[]
+
+            for item in line[0]:
+                lis.append(item)
+
+            for i in range(n):
+                if i == ind:
+                    lis.append(1)
+                else :
+                    lis.append(0)
+            return lis
+            
+        def header_helper(nb_vars,nb_eps):
+            lis=['']
+            for i in self.programme.get('variables',range(nb_vars)):
+                lis.append(f'X_{{{i+1}}}')
+
+            for i in self.programme.get('rows',range(nb_eps)):
+                lis.append(f'e_{{{i+1}}}')
+            lis.append('')
+            return lis
+
+        def footer_helper(vars,nb_eps):
+            lis=['Z']
+            for item in vars:
+                lis.append(item)
+
+            for i in range(nb_eps):
+                lis.append(0)
+            lis.append(0)
+            return lis
+        
+        f = self.programme['function']
+        lo = [b[0] for b in self.bounds()]
+        if sparse:
+            return self.sparse_first_table(f,lo,header_helper)
+        sc = [[dense_row(line[0],len(f)),line[1]] for line in self.programme['contraintes']]
+        if any(lo):
+            # x = lo + x', so the rows and Z see x' >= 0
+            sc = [[line[0],line[1]-sum(a*l for a,l in zip(line[0],lo))] for line in sc]
+        t=[]
+        t.append(header_helper(len(f),len(sc)))
+        i=0
+        for line in sc:
+            t.append([
+                t[0][len(f)+i+1],*line_helper(line,i,len(sc)),line[1]
+            ])
+            i+=1
+        t.append(footer_helper(f,len(sc)))
+        if any(lo):
+            t[-1][-1]=-sum(c*l for c,l in zip(f,lo))
+
+        return t
+
+    def sparse_first_table(self,f,lo,header_helper):
+        n=len(f)
+        m=len(self.programme['contraintes'])
+        rows=[]
+        for i,(line,rhs) in enumerate(self.programme['contraintes']):
+            d={j:v for j,v in (line.items() if isinstance(line,dict) else enumerate(line)) if v}
+            if any(lo):
+                rhs=rhs-sum(v*lo[j] for j,v in d.items())
+            d[n+i]=1
+            if rhs:
+                d[n+m]=rhs
+            rows.append(d)
+        z={j:v for j,v in enumerate(f) if v}
+        if any(lo):
+            z[n+m]=-sum(c*l for c,l in zip(f,lo))
+        header=header_helper(n,m)
+        return SparseTable(header,header[n+1:n+m+1],[*rows,z])
+    
+    def crash_basis(self):
+        """Triangular crash: structural columns by decreasing cost, each one
+        taking the slack of its ratio test row provided it is zero on the rows
+        already taken. The basis stays triangular (so nonsingular) and the
+        slack values stay nonnegative, steps() then starts from a feasible
+        basis. Returns the m basic columns for basis_table()."""
+        t=self.firstTable()
+        n=len(self.programme['function'])
+        rows=t[1:-1]
+        b=[row[-1] for row in rows]
+        taken={}
+        cost=t[-1][1:n+1]
+        for j in sorted((j for j in range(n) if cost[j]>0),key=lambda j:-cost[j]):
+            col=[row[j+1] for row in rows]
+            if any(col[i] for i in taken):
+                continue
+            cand=[i for i in range(len(rows)) if col[i]>0 and b[i]>=0]
+            if not cand:
+                continue
+            r=min(cand,key=lambda i:(b[i]/col[i],-col[i]))
+            x=Fraction(b[r])/col[r]
+            if j+1 in self.upper and x>self.upper[j+1]:
+                continue
+            b=[v-a*x for v,a in zip(b,col)]
+            b[r]=x
+            taken[r]=j+1
+        return [taken.get(i,n+1+i) for i in range(len(rows))]
+
+    def basis_table(self,basis,flipped=(),engine=None):
+        """First table pivoted so that the columns of `basis` (labels such as
+        'X_{2}' or column indices) are basic, as far as they are independent,
+        and the `flipped` columns complemented. The result may be infeasible,
+        steps() repairs it."""
+        tableau=ENGINES[engine or self.engine](self.firstTable(self.sparse_input(engine)))
+        for col in flipped:
+            tableau.flip(col,self.upper[col])
+        cols=[c if isinstance(c,int) else tableau.header.index(c) for c in basis]
+        wanted={tableau.header[c] for c in cols}
+        for col in cols:
+            if tableau.header[col] in tableau.labels:
+                continue
+            a=np.abs(tableau.column(col))
+            free=[i for i in range(len(a)) if a[i]>1e-9 and tableau.labels[i] not in wanted]
+            if free:
+                tableau.pivot(max(free,key=lambda i:a[i])+1,col)
+        return tableau.snapshot()
+
+    # engine='mixed': solve in float64 first, then certify its final basis
+    # in exact arithmetic from the basis alone: the structural basic columns
+    # on the rows whose slack is not basic form a k x k block K, and integer
+    # (fraction-free) elimination of K gives x_B and the duals, so primal and
+    # dual feasibility are checked without any full-table pivot. A certified
+    # basis has its final table filled in from the same elimination;
+    # otherwise the basis is rebuilt by pivots and steps() goes on from it
+    # with exact pivots, so the result is exact either way.
+
+    def float_basis(self):
+        """(basic columns, flipped columns) of a float64 solve, None if the
+        float solve stops on Unbounded/Infeasible."""
+        try:
+            s=SimplexSolver(self.programme,engine='float',history=False,pivot_rule=self.pivot_rule,basis=self.basis,crash=self.crash)
+        except (Unbounded,Infeasible):
+            return None
+        self.float_iterations=s.iterations
+        t=s.tables[-1]['table']
+        return [t[0].index(row[0]) for row in t[1:-1]],s.flipped
+
+    def certified_table(self):
+        found=self.float_basis()
+        if found is None:
+            # no basis to certify, the exact pivots start from scratch
+            self.certified=False
+            return self.firstTable() if self.basis is None else self.basis_table(self.basis)
+        basis,flipped=found
+        self.flipped=set(flipped)
+        table=self.optimal_basis_table(basis)
+        self.certified=table is not None
+        if table is None:
+            table=self.basis_table(basis,flipped,'bareiss')
+        return table
+
+    def optimal_basis_table(self,basis):
+        """Exact final table of `basis` (one column index per row, the
+        columns of self.flipped complemented), or None when that basis is
+        singular or not optimal."""
+        t=self.firstTable(sparse=True)
+        N=t.n
+        m=len(t.labels)
+        n=N-m
+        rows=[dict(d) for d in t.rows]
+        for col in self.flipped:
+            j=col-1
+            for d in rows:
+                if j in d:
+                    d[N]=d.get(N,0)-self.upper[col]*d[j]
+                    d[j]=-d[j]
+        # every row scaled to integers (B^-1 [A I b] does not change)
+        R=[]
+        for d in rows:
+            if all(isinstance(v,int) for v in d.values()):
+                L=1
+                R.append({j:v for j,v in d.items() if v})
+                continue
+            d={j:Fraction(v) for j,v in d.items() if v}
+            L=math.lcm(1,*(v.denominator for v in d.values()))
+            R.append({j:int(v*L) for j,v in d.items()})
+        Z=R.pop()
+        # (L: the scale of Z)
+        cols=[c-1 for c in basis]
+        S=[c for c in cols if c<n]
+        P=sorted(set(range(m))-{c-n for c in cols if c>=n})
+        if len(P)!=len(S):
+            return None
+        # fraction-free Gauss-Jordan on [K | I]: row piv[c] ends as
+        # [D e_c | D K^-1 (row of c)]
+        k=len(S)
+        W=[[R[p].get(c,0) for c in S]+[int(i==q) for q in range(k)] for i,p in enumerate(P)]
+        D=1
+        piv={}
+        for a,c in enumerate(S):
+            r=next((i for i in range(k) if i not in piv.values() and W[i][a]),None)
+            if r is None:
+                return None
+            piv[c]=r
+            w=W[r][a]
+            for i in range(k):
+                if i!=r and W[i][a]:
+                    f=W[i][a]
+                    W[i]=[(w*x-f*y)//D for x,y in zip(W[i],W[r])]
+                elif i!=r:
+                    W[i]=[w*x//D for x in W[i]]
+            D=w
+        if D<0:
+            W=[[-x for x in row] for row in W]
+            D=-D
+        inv={c:W[piv[c]][k:] for c in S}
+        # x_B: structural basics, then the basic slacks (numerators over D*L)
+        b=[R[p].get(N,0) for p in P]
+        x={c:sum(v*w for v,w in zip(inv[c],b)) for c in S}
+        for c in S:
+            u=self.upper.get(c+1)
+            if x[c]<0 or u is not None and Fraction(x[c],D)>u:
+                return None
+        for c in cols:
+            if c>=n:
+                r=R[c-n]
+                if D*r.get(N,0)-sum(r.get(s,0)*x[s] for s in S)<0:
+                    return None
+        # reduced costs D*Z - (Z_S K^-1) R_P, all <= 0
+        g=[sum(Z.get(c,0)*inv[c][i] for c in S) for i in range(k)]
+        z={j:D*v for j,v in Z.items()}
+        for gi,p in zip(g,P):
+            if gi:
+                for j,v in R[p].items():
+                    z[j]=z.get(j,0)-gi*v
+        if any(v>0 for j,v in z.items() if j<N):
+            return None
+        # certified: B^-1 [A I b] row by row
+        T={}
+        for c in S:
+            d={}
+            for w,p in zip(inv[c],P):
+                if w:
+                    for j,v in R[p].items():
+                        d[j]=d.get(j,0)+w*v
+            T[c]=d
+        zero=Fraction(0)
+        def dense(d,den):
+            lis=[zero]*(N+1)
+            for j,v in d.items():
+                if v:
+                    lis[j]=Fraction(v,den)
+            return lis
+        table=[list(t.header)]
+        for c in cols:
+            if c<n:
+                table.append([t.header[c+1],*dense(T[c],D)])
+                continue
+            r=R[c-n]
+            d={j:D*v for j,v in r.items()}
+            for s in S:
+                if s in r:
+                    for j,v in T[s].items():
+                        d[j]=d.get(j,0)-r[s]*v
+            table.append([t.header[c+1],*dense(d,D*r[c])])
+        table.append(['Z',*dense(z,D*L)])
+        return table
+
+    def price_out(self,table,costs=None):
+        """Rebuild the Z row of `table` from the objective (zeros if costs==0)."""
+        f=self.programme['function'] if costs is None else costs
+        n=table.n if isinstance(table,SparseTable) else len(table[0])-2
+        c=[0]*n
+        constant=0
+        if f!=0:
+            c[:len(f)]=f
+            for j,(lo,hi) in enumerate(self.bounds()):
+                constant+=c[j]*lo
+                if j+1 in self.flipped:
+                    constant+=c[j]*self.upper[j+1]
+                    c[j]=-c[j]
+        if isinstance(table,SparseTable):
+            z={j:v for j,v in enumerate(c) if v}
+            if constant:
+                z[n]=-constant
+            index={label:j for j,label in enumerate(table.header[1:-1])}
+            for label,row in zip(table.labels,table.rows):
+                cb=c[index[label]]
+                if cb:
+                    for j,v in row.items():
+                        z[j]=z.get(j,0)-cb*v
+            table.rows[-1]={j:v for j,v in z.items() if v}
+            return table
+        z=[*c,-constant]
+        for row in table[1:-1]:
+            cb=c[table[0].index(row[0])-1]
+            if cb:
+                z=[v-cb*w for v,w in zip(z,row[1:])]
+        table[-1]=['Z',*z]
+        return table
+
+    def steps(self,snapshots=True,table=None):
+        """Solve from the first table, yielding one {'piv','table'} step per pivot.
+
+        'piv' is the [row,col] pivot applied to that table (None on the final
+        one) and 'table' its snapshot, or None when snapshots is False. An
+        integer snapshots=k only takes the table every k steps and after the
+        tableau is rebuilt (see history.History). The final step always
+        carries its table.
+
+        Tables with negative right-hand sides go through dual simplex first;
+        if they are not dual feasible either, that phase runs on a zero
+        objective and the Z row is priced out again afterwards.
+        """
+        start=time.perf_counter()
+        self.upper={j+1:hi-lo for j,(lo,hi) in enumerate(self.bounds()) if hi is not None}
+        if table is None:
+            self.flipped=set()
+            if self.engine=='mixed':
+                table=self.certified_table()
+            else:
+                if self.crash:
+                    self.basis=self.crash_basis()
+                table=self.firstTable(self.sparse_input()) if self.basis is None else self.basis_table(self.basis)
+        tableau=self.make_tableau(table)
+        reprice=self._reprice
+        # on the zero objective every dual pivot is degenerate, only Bland's
+        # smallest index rule keeps that phase from cycling
+        zero=False
+        if self.violated_row(tableau) is not None and tableau.entering() is not None:
+            tableau=self.make_tableau(self.price_out(table,0))
+            reprice=zero=True
+        fresh=True
+        self.tableau=tableau
+        self.iterations=0
+        self.rule.start(tableau)
+        metrics=self.metrics
+        if metrics:
+            metrics.reset()
+        while True:
+            if metrics:
+                metrics.begin(tableau)
+            phase='dual'
+            if self.upper:
+                pivot,flips=self.get_bounded_dual_pivot(tableau,zero)
+            else:
+                pivot,flips=self.get_dual_pivot(tableau,zero),[]
+            if pivot is None and reprice:
+                tableau=self.make_tableau(self.price_out(getattr(tableau,'sparse_snapshot',tableau.snapshot)()))
+                self.tableau=tableau
+                self.rule.start(tableau)
+                reprice=zero=False
+                fresh=True
+                if metrics:
+                    metrics.objective=tableau.objective()
+            if pivot is None and not flips:
+                phase='primal'
+                if self.upper:
+                    pivot,flips=self.get_bounded_pivot(tableau)
+                else:
+                    pivot=self.get_pivot(tableau)
+            if pivot is None and not flips:
+                self.time=time.perf_counter()-start
+                yield {'piv':None,'table':tableau.snapshot()}
+                return
+            snap=snapshots and (fresh or self.iterations%snapshots==0)
+            fresh=False
+            step={'piv':pivot,'table':tableau.snapshot() if snap else None}
+            if flips:
+                # columns complemented right after the pivot (or alone)
+                step['flip']=flips
+            yield step
+            if metrics:
+                metrics.lap(None)
+                entering=tableau.header[pivot[1]] if pivot else None
+                leaving=tableau.labels[pivot[0]-1] if pivot else None
+            if pivot:
+                self.rule.update(tableau,*pivot)
+                tableau.pivot(*pivot)
+            for col in flips:
+                tableau.flip(col,self.upper[col])
+                self.flipped^={col}
+            self.iterations+=1
+            if metrics:
+                metrics.pivot(tableau,self.iterations,phase,entering,leaving,[tableau.header[c] for c in flips])
+
+    def solution(self):
+        t=self.tables[-1]['table']
+        n=len(self.programme['function'])
+        x=[0]*n
+        for row in t[1:-1]:
+            j=t[0].index(row[0])-1
+            if j<n:
+                x[j]=row[-1]
+        for j,(lo,hi) in enumerate(self.bounds()):
+            if j+1 in self.flipped:
+                x[j]=self.upper[j+1]-x[j]
+            if lo:
+                x[j]=lo+x[j]
+        if self.presolve:
+            x=self.presolve.postsolve(x)
+        return {'x':x,'z':-t[-1][-1]}
+
+    # warm start: edits are applied to the final table and reoptimize()
+    # continues from that basis instead of the slack basis
+
+    def _edit_table(self):
+        if self.presolve:
+            raise ValueError("warm start edits refer to the original model, solve it without presolve")
+        if self._pending is None:
+            self.programme=copy.deepcopy(self.programme)
+            self._pending=self.tableau.snapshot()
+        return self._pending
+
+    def set_rhs(self,i,value):
+        t=self._edit_table()
+        delta=value-self.programme['contraintes'][i][1]
+        self.programme['contraintes'][i][1]=value
+        col=t[0].index(f'e_{{{i+1}}}')
+        for row in t[1:]:
+            if row[col]:
+                row[-1]+=delta*row[col]
+
+    def set_objective(self,j,value):
+        self._edit_table()
+        self.programme['function'][j]=value
+        self._reprice=True
+
+    def add_constraint(self,coeffs,rhs):
+        t=self._edit_table()
+        sc=self.programme['contraintes']
+        sc.append([list(coeffs),rhs])
+        label=f'e_{{{len(sc)}}}'
+        coeffs=list(coeffs)
+        for j,(lo,hi) in enumerate(self.bounds()):
+            rhs-=coeffs[j]*lo
+            if j+1 in self.flipped:
+                rhs-=coeffs[j]*self.upper[j+1]
+                coeffs[j]=-coeffs[j]
+        t[0].insert(-1,label)
+        for row in t[1:]:
+            row.insert(-1,0)
+        new=[label,*coeffs]
+        new+=[0]*(len(t[0])-len(new)-2)+[1,rhs]
+        for row in t[1:-1]:
+            v=new[t[0].index(row[0])]
+            if v:
+                new=[new[0],*[a-v*b for a,b in zip(new[1:],row[1:])]]
+        t.insert(-1,new)
+
+    def reoptimize(self):
+        table,self._pending=self._pending,None
+        if table is None:
+            return self.tables[-1]['table']
+        self.tables=self.record(self.steps(self.checkpoint_every(),table))
+        self._reprice=False
+        return self.tables[-1]['table']
+
+    def stats(self):
+        return {
+            'engine':self.engine,
+            'pivot_rule':self.rule.name,
+            'iterations':self.iterations,
+            'time':self.time,
+            **({'float_iterations':self.float_iterations,'certified':self.certified} if self.engine=='mixed' else {}),
+            **({'metrics':self.metrics.summary()} if self.metrics else {}),
+        }
+
+
+if __name__ == "__main__":
+    # sparse benchmark: exact dense vs exact sparse engine on ~5% dense programmes
+    # crash benchmark: slack start vs crash_basis() start, iterations and time
+    # mixed benchmark: exact 'fraction'/'bareiss' vs float64 solve certified exactly ('mixed')
+    import random,time
+    import solver
+    # presolve regressions: a spurious Unbounded after a removed row, and
+    # empty-column rows proved infeasible by presolve itself
+    programme={'function':[-1,0],'contraintes':[[[9,9],29],[[2,2],1]]}
+    for engine in ['fraction','float','revised']:
+        for rule in ['steepest','devex']:
+            s=SimplexSolver(programme,engine=engine,pivot_rule=rule,presolve=True,history=False)
+            assert s.solution()['z']==0
+    for programme in [{'function':[7,-1,9],'contraintes':[[[4,7,0],-10]]},
+                      {'function':[1,5,3,2],'contraintes':[[[0,8,0,0],12],[[0,7,1,0],-4]]}]:
+        for presolve in [False,True]:
+            try:
+                SimplexSolver(programme,presolve=presolve,history=False)
+                raise AssertionError(programme)
+            # (presolve raises solver.Infeasible, not __main__.Infeasible)
+            except (Infeasible,solver.Infeasible):
+                pass
+    rd=random.Random(0)
+    crash_set=[]
+    for m,n in [(20,40),(40,80),(60,120)]:
+        A=[[rd.randint(1,9) if rd.random()<0.05 else 0 for _ in range(n)] for _ in range(m)]
+        for j in range(n):
+            A[rd.randrange(m)][j]=rd.randint(1,9)
+        sc=[[A[i],rd.randint(10,100)] for i in range(m)]
+        programme={"function":[rd.randint(1,20) for _ in range(n)],"contraintes":sc}
+        crash_set.append((f"sparse m={m} n={n}",programme))
+        res=[]
+        for engine in ['fraction','sparse']:
+            t=time.perf_counter()
+            s=SimplexSolver(programme,engine=engine,history=False)
+            res.append((engine,time.perf_counter()-t,s.tables[-1]['table'][-1][-1]))
+        assert res[0][2]==res[1][2]
+        print(f"m={m} n={n} "+" ".join(f"{e}={t:.3f}s" for e,t,_ in res)+f" speedup x{res[0][1]/res[1][1]:.1f}")
+    for m,n in [(30,60),(60,120)]:
+        programme={"function":[rd.randint(1,20) for _ in range(n)],
+                   "contraintes":[[[rd.randint(0,9) for _ in range(n)],rd.randint(100,1000)] for _ in range(m)]}
+        crash_set.append((f"dense m={m} n={n}",programme))
+    for name,programme in crash_set:
+        line=[name]
+        z=[]
+        for engine in ['fraction','float']:
+            for crash in [False,True]:
+                s=SimplexSolver(programme,engine=engine,history=False,crash=crash)
+                z.append(float(s.tables[-1]['table'][-1][-1]))
+                # crash pivots are made by basis_table, outside s.iterations
+                k=sum(1 for c in s.basis if c<=len(programme['function'])) if crash else 0
+                line.append(f"{engine}{f'+crash({k})' if crash else ''}={s.time:.3f}s/{s.iterations}it")
+        assert max(z)-min(z)<=1e-6*abs(z[0])
+        print(" ".join(line))
+    for name,programme in crash_set:
+        res={}
+        for engine in ['fraction','bareiss','float','mixed']:
+            s=SimplexSolver(programme,engine=engine,history=False)
+            res[engine]=(s.time,s.tables[-1]['table'][-1][-1])
+        assert res['mixed'][1]==res['fraction'][1]==res['bareiss'][1]
+        print(f"{name} "+" ".join(f"{e}={t:.3f}s" for e,(t,_) in res.items())
+              +f" certified={s.certified} repair={s.iterations}it speedup x{res['fraction'][0]/res['mixed'][0]:.1f}")
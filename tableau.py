@@ -0,0 +1,591 @@
+from fractions import Fraction
+import math
+import numpy as np
+
+# Tableau engines used by SimplexSolver.
+# Every engine is built from the table produced by SimplexSolver.firstTable
+# (header row, label column, Z row last) and works with the same indices as
+# that table: rows 1..m are constraints, columns 1..n+m are variables.
+# Engines with sparse_table = True also accept that table as a SparseTable
+# (firstTable(sparse=True)), which is never densified.
+
+
+class SparseTable:
+    """A table as its nonzeros: rows[i] maps a column (0-based, the
+    right-hand side under key n) to its value, rows[-1] being the Z row."""
+
+    def __init__(self, header, labels, rows):
+        self.header = header
+        self.labels = labels
+        self.rows = rows
+        self.n = len(header)-2
+
+    def dense(self):
+        """The same table as nested lists."""
+        def row(d):
+            lis = [0]*(self.n+1)
+            for j, v in d.items():
+                lis[j] = v
+            return lis
+        return [list(self.header), *([label, *row(d)] for label, d in zip(self.labels, self.rows)), ['Z', *row(self.rows[-1])]]
+
+
+class FractionTableau:
+    """Exact engine: every cell is a Fraction."""
+
+    tol = 0
+
+    def __init__(self, table):
+        self.header = list(table[0])
+        self.labels = [row[0] for row in table[1:-1]]
+        self.t = [[Fraction(v) for v in row[1:]] for row in table[1:]]
+
+    def entering(self):
+        z = self.t[-1]
+        col = None
+        m = 0
+        for j in range(len(z)-1):
+            if z[j] > m:
+                m = z[j]
+                col = j+1
+        return col
+
+    def leaving(self, col, bland=False):
+        row = None
+        m = None
+        for i in range(len(self.t)-1):
+            a = self.t[i][col-1]
+            if a <= 0:
+                continue
+            ratio = self.t[i][-1]/a
+            if m is None or ratio < m or (bland and ratio == m and self.basic_index(i) < self.basic_index(row-1)):
+                m = ratio
+                row = i+1
+        return row
+
+    def dual_leaving(self):
+        row = None
+        m = 0
+        for i in range(len(self.t)-1):
+            if self.t[i][-1] < m:
+                m = self.t[i][-1]
+                row = i+1
+        return row
+
+    def dual_entering(self, row, upper=False):
+        # upper=True: the basic variable of `row` leaves at its upper bound,
+        # which is the usual test on the negated row
+        sign = -1 if upper else 1
+        r = self.t[row-1]
+        z = self.t[-1]
+        own = self.basic_index(row-1)-1
+        col = None
+        m = None
+        for j in range(len(r)-1):
+            a = sign*r[j]
+            if a >= 0 or j == own:
+                continue
+            ratio = z[j]/a
+            if m is None or ratio < m:
+                m = ratio
+                col = j+1
+        return col
+
+    def column_exact(self, col):
+        return [row[col-1] for row in self.t[:-1]]
+
+    def rhs_exact(self):
+        return [row[-1] for row in self.t[:-1]]
+
+    def flip(self, col, u):
+        """Complement nonbasic column col: x = u - x'."""
+        c = col-1
+        for row in self.t:
+            if row[c]:
+                row[-1] -= u*row[c]
+                row[c] = -row[c]
+
+    def basic_index(self, i):
+        return self.header.index(self.labels[i])
+
+    def objective(self):
+        return -self.t[-1][-1]
+
+    def bits(self):
+        """Largest numerator and denominator bit lengths in the table."""
+        cells = [v for row in self.t for v in row]
+        return max((abs(v.numerator).bit_length() for v in cells), default=0), max((v.denominator.bit_length() for v in cells), default=0)
+
+    def reduced_costs(self, cols=None):
+        z = np.array([float(v) for v in self.t[-1][:-1]])
+        return z if cols is None else z[cols]
+
+    def column(self, col):
+        return np.array([float(row[col-1]) for row in self.t[:-1]])
+
+    def row(self, row):
+        return np.array([float(v) for v in self.t[row-1][:-1]])
+
+    def tmul(self, v):
+        T = np.array([[float(x) for x in row[:-1]] for row in self.t[:-1]])
+        return T.T @ v
+
+    def pivot(self, row, col):
+        t = self.t
+        r, c = row-1, col-1
+        p = t[r][c]
+        t[r] = [v/p for v in t[r]]
+        pr = t[r]
+        for i in range(len(t)):
+            f = t[i][c]
+            if i == r or f == 0:
+                continue
+            t[i] = [v - f*w for v, w in zip(t[i], pr)]
+        self.labels[r] = self.header[col]
+
+    def snapshot(self):
+        lis = [list(self.header)]
+        for i, row in enumerate(self.t[:-1]):
+            lis.append([self.labels[i], *row])
+        lis.append(['Z', *self.t[-1]])
+        return lis
+
+
+class FloatTableau:
+    """float64 engine: the tableau is one contiguous (m+1)x(n+m+1) array.
+
+    Entering column and ratio test are array reductions, a pivot is a single
+    rank-1 update. `tol` is the pivot / optimality tolerance.
+    """
+
+    def __init__(self, table, tol=1e-9):
+        self.header = list(table[0])
+        self.labels = [row[0] for row in table[1:-1]]
+        self.t = np.array([[float(v) for v in row[1:]] for row in table[1:]], dtype=np.float64)
+        self.tol = tol
+
+    def entering(self):
+        z = self.t[-1, :-1]
+        if not len(z):
+            return None
+        j = int(np.argmax(z))
+        if z[j] <= self.tol:
+            return None
+        return j+1
+
+    def leaving(self, col, bland=False):
+        a = self.t[:-1, col-1]
+        mask = a > self.tol
+        if not mask.any():
+            return None
+        b = np.maximum(self.t[:-1, -1], 0)
+        ratios = np.full(a.shape, np.inf)
+        np.divide(b, a, out=ratios, where=mask)
+        i = int(np.argmin(ratios))
+        if bland:
+            ties = np.flatnonzero(ratios <= ratios[i]+self.tol)
+            i = min(ties.tolist(), key=self.basic_index)
+        return i+1
+
+    def dual_leaving(self):
+        b = self.t[:-1, -1]
+        if not len(b):
+            return None
+        i = int(np.argmin(b))
+        if b[i] >= -self.tol:
+            return None
+        return i+1
+
+    def dual_entering(self, row, upper=False):
+        a = self.t[row-1, :-1]*(-1 if upper else 1)
+        mask = a < -self.tol
+        mask[self.basic_index(row-1)-1] = False
+        if not mask.any():
+            return None
+        ratios = np.full(a.shape, np.inf)
+        np.divide(np.minimum(self.t[-1, :-1], 0), a, out=ratios, where=mask)
+        return int(np.argmin(ratios))+1
+
+    def column_exact(self, col):
+        return self.t[:-1, col-1]
+
+    def rhs_exact(self):
+        return self.t[:-1, -1]
+
+    def flip(self, col, u):
+        c = col-1
+        self.t[:, -1] -= float(u)*self.t[:, c]
+        self.t[:, c] *= -1
+
+    def basic_index(self, i):
+        return self.header.index(self.labels[i])
+
+    def objective(self):
+        return -float(self.t[-1, -1])
+
+    def reduced_costs(self, cols=None):
+        z = self.t[-1, :-1]
+        return z if cols is None else z[cols]
+
+    def column(self, col):
+        return self.t[:-1, col-1]
+
+    def row(self, row):
+        return self.t[row-1, :-1]
+
+    def tmul(self, v):
+        return v @ self.t[:-1, :-1]
+
+    def pivot(self, row, col):
+        t = self.t
+        r, c = row-1, col-1
+        t[r] /= t[r, c]
+        f = t[:, c].copy()
+        f[r] = 0
+        t -= np.outer(f, t[r])
+        t[:, c] = 0
+        t[r, c] = 1
+        self.labels[r] = self.header[col]
+
+    def snapshot(self):
+        lis = [list(self.header)]
+        for i, row in enumerate(self.t[:-1].tolist()):
+            lis.append([self.labels[i], *row])
+        lis.append(['Z', *self.t[-1].tolist()])
+        return lis
+
+
+class SparseTableau:
+    """Exact engine storing each row as a dict {column: Fraction} of its nonzeros.
+
+    The right-hand side lives under key n (the last column) and `cols` maps
+    every column to the set of rows where it is nonzero, so a pivot only
+    visits the rows of the pivot column and the nonzeros of the pivot row.
+    """
+
+    tol = 0
+    sparse_table = True
+
+    def __init__(self, table):
+        if isinstance(table, SparseTable):
+            self.header = list(table.header)
+            self.labels = list(table.labels)
+            rows = [d.items() for d in table.rows]
+        else:
+            self.header = list(table[0])
+            self.labels = [row[0] for row in table[1:-1]]
+            rows = [enumerate(row[1:]) for row in table[1:]]
+        self.n = len(self.header)-2
+        self.rows = []
+        self.cols = [set() for _ in range(self.n+1)]
+        for i, row in enumerate(rows):
+            d = {}
+            for j, v in row:
+                if v:
+                    d[j] = Fraction(v)
+                    self.cols[j].add(i)
+            self.rows.append(d)
+
+    def entering(self):
+        col = None
+        m = 0
+        for j, v in self.rows[-1].items():
+            if j < self.n and v > m:
+                m = v
+                col = j+1
+        return col
+
+    def leaving(self, col, bland=False):
+        row = None
+        m = None
+        last = len(self.rows)-1
+        for i in sorted(self.cols[col-1]):
+            a = self.rows[i][col-1]
+            if i == last or a <= 0:
+                continue
+            ratio = self.rows[i].get(self.n, 0)/a
+            if m is None or ratio < m or (bland and ratio == m and self.basic_index(i) < self.basic_index(row-1)):
+                m = ratio
+                row = i+1
+        return row
+
+    def dual_leaving(self):
+        row = None
+        m = 0
+        for i, d in enumerate(self.rows[:-1]):
+            if d.get(self.n, 0) < m:
+                m = d[self.n]
+                row = i+1
+        return row
+
+    def dual_entering(self, row, upper=False):
+        sign = -1 if upper else 1
+        z = self.rows[-1]
+        own = self.basic_index(row-1)-1
+        col = None
+        m = None
+        for j, a in self.rows[row-1].items():
+            a = sign*a
+            if j == self.n or j == own or a >= 0:
+                continue
+            ratio = z.get(j, 0)/a
+            if m is None or ratio < m or (ratio == m and j+1 < col):
+                m = ratio
+                col = j+1
+        return col
+
+    def column_exact(self, col):
+        return [d.get(col-1, Fraction(0)) for d in self.rows[:-1]]
+
+    def rhs_exact(self):
+        return [d.get(self.n, Fraction(0)) for d in self.rows[:-1]]
+
+    def flip(self, col, u):
+        c = col-1
+        for i in self.cols[c]:
+            d = self.rows[i]
+            b = d.get(self.n, 0) - u*d[c]
+            d[c] = -d[c]
+            if b:
+                d[self.n] = b
+                self.cols[self.n].add(i)
+            elif self.n in d:
+                del d[self.n]
+                self.cols[self.n].discard(i)
+
+    def basic_index(self, i):
+        return self.header.index(self.labels[i])
+
+    def _dense(self, d):
+        v = np.zeros(self.n)
+        for j, x in d.items():
+            if j < self.n:
+                v[j] = float(x)
+        return v
+
+    def reduced_costs(self, cols=None):
+        z = self._dense(self.rows[-1])
+        return z if cols is None else z[cols]
+
+    def column(self, col):
+        v = np.zeros(len(self.rows)-1)
+        for i in self.cols[col-1]:
+            if i < len(v):
+                v[i] = float(self.rows[i][col-1])
+        return v
+
+    def row(self, row):
+        return self._dense(self.rows[row-1])
+
+    def tmul(self, v):
+        out = np.zeros(self.n)
+        for i in np.flatnonzero(v).tolist():
+            for j, x in self.rows[i].items():
+                if j < self.n:
+                    out[j] += v[i]*float(x)
+        return out
+
+    def pivot(self, row, col):
+        r, c = row-1, col-1
+        p = self.rows[r][c]
+        pr = {j: v/p for j, v in self.rows[r].items()}
+        self.rows[r] = pr
+        for i in list(self.cols[c]):
+            if i == r:
+                continue
+            d = self.rows[i]
+            f = d[c]
+            for j, v in pr.items():
+                x = d.get(j, 0) - f*v
+                if x:
+                    if j not in d:
+                        self.cols[j].add(i)
+                    d[j] = x
+                elif j in d:
+                    del d[j]
+                    self.cols[j].discard(i)
+        self.labels[r] = self.header[col]
+
+    def nnz(self):
+        return sum(len(d) for d in self.rows)
+
+    def objective(self):
+        return -self.rows[-1].get(self.n, Fraction(0))
+
+    def bits(self):
+        cells = [v for d in self.rows for v in d.values()]
+        return max((abs(v.numerator).bit_length() for v in cells), default=0), max((v.denominator.bit_length() for v in cells), default=0)
+
+    def sparse_snapshot(self):
+        return SparseTable(list(self.header), list(self.labels), [dict(d) for d in self.rows])
+
+    def snapshot(self):
+        def dense(d):
+            lis = [Fraction(0)]*(self.n+1)
+            for j, v in d.items():
+                lis[j] = v
+            return lis
+        lis = [list(self.header)]
+        for i, d in enumerate(self.rows[:-1]):
+            lis.append([self.labels[i], *dense(d)])
+        lis.append(['Z', *dense(self.rows[-1])])
+        return lis
+
+
+class BareissTableau:
+    """Exact fraction-free engine (Edmonds/Bareiss integer pivoting).
+
+    The tableau is an integer matrix W with one shared denominator D: a
+    pivot computes (W_ij*W_rs - W_is*W_rj)/D, which is always an exact
+    integer division, and D becomes the pivot. To make the starting table
+    integral, constraint rows are multiplied by L (lcm of their
+    denominators), the Z row by its own lcm, and the starting basic
+    variables are rescaled by L so the basis stays an identity. The real
+    cell is W_ij*scale[j]/(D*scale[basic(i)]) and is only built as a
+    Fraction by snapshot().
+    """
+
+    tol = 0
+
+    def __init__(self, table):
+        self.header = list(table[0])
+        self.labels = [row[0] for row in table[1:-1]]
+        rows = [[Fraction(v) for v in row[1:]] for row in table[1:-1]]
+        z = [Fraction(v) for v in table[-1][1:]]
+        L = math.lcm(1, *(v.denominator for row in rows for v in row))
+        self.scale = [1]*len(z)
+        for label in self.labels:
+            self.scale[self.header.index(label)-1] = L
+        self.W = [[int(L*v/self.scale[j]) for j, v in enumerate(row)] for row in rows]
+        zs = [v/self.scale[j] for j, v in enumerate(z)]
+        self.zscale = math.lcm(1, *(v.denominator for v in zs))
+        self.W.append([int(self.zscale*v) for v in zs])
+        self.D = 1
+
+    def basic_index(self, i):
+        return self.header.index(self.labels[i])
+
+    def _rowscale(self, i):
+        if i == len(self.W)-1:
+            return self.zscale
+        return self.scale[self.basic_index(i)-1]
+
+    def entering(self):
+        z = self.W[-1]
+        col = None
+        m = 0
+        for j in range(len(z)-1):
+            v = z[j]*self.scale[j]
+            if v > m:
+                m = v
+                col = j+1
+        return col
+
+    def leaving(self, col, bland=False):
+        s = col-1
+        row = None
+        for i in range(len(self.W)-1):
+            a = self.W[i][s]
+            if a <= 0:
+                continue
+            if row is None:
+                row = i
+                continue
+            # W_ib/a < W_rb/W_rs without dividing
+            lhs = self.W[i][-1]*self.W[row][s]
+            rhs = self.W[row][-1]*a
+            if lhs < rhs or (bland and lhs == rhs and self.basic_index(i) < self.basic_index(row)):
+                row = i
+        return None if row is None else row+1
+
+    def dual_leaving(self):
+        row = None
+        for i in range(len(self.W)-1):
+            b = self.W[i][-1]
+            if b >= 0:
+                continue
+            if row is None or b*self._rowscale(row) < self.W[row][-1]*self._rowscale(i):
+                row = i
+        return None if row is None else row+1
+
+    def dual_entering(self, row, upper=False):
+        sign = -1 if upper else 1
+        r = [sign*v for v in self.W[row-1]]
+        z = self.W[-1]
+        own = self.basic_index(row-1)-1
+        col = None
+        for j in range(len(r)-1):
+            if r[j] >= 0 or j == own:
+                continue
+            if col is None or z[j]*r[col] < z[col]*r[j]:
+                col = j
+        return None if col is None else col+1
+
+    def column_exact(self, col):
+        s = col-1
+        return [Fraction(self.W[i][s]*self.scale[s], self.D*self._rowscale(i)) for i in range(len(self.W)-1)]
+
+    def rhs_exact(self):
+        return [Fraction(self.W[i][-1])*self.scale[-1]/(self.D*self._rowscale(i)) for i in range(len(self.W)-1)]
+
+    def flip(self, col, u):
+        # rhs -= u*column needs u*scale[s]/scale[rhs] integral: the rhs
+        # column takes the missing denominator into its own scale
+        s = col-1
+        f = Fraction(u)*self.scale[s]/self.scale[-1]
+        q, p = f.denominator, f.numerator
+        for row in self.W:
+            row[-1] = q*row[-1] - p*row[s]
+            row[s] = -row[s]
+        self.scale[-1] = Fraction(self.scale[-1], q)
+
+    def reduced_costs(self, cols=None):
+        d = self.D*self.zscale
+        z = np.array([v*self.scale[j]/d for j, v in enumerate(self.W[-1][:-1])])
+        return z if cols is None else z[cols]
+
+    def column(self, col):
+        s = col-1
+        return np.array([self.W[i][s]*self.scale[s]/(self.D*self._rowscale(i)) for i in range(len(self.W)-1)])
+
+    def row(self, row):
+        d = self.D*self._rowscale(row-1)
+        return np.array([v*self.scale[j]/d for j, v in enumerate(self.W[row-1][:-1])])
+
+    def tmul(self, v):
+        T = np.array([self.row(i) for i in range(1, len(self.W))])
+        return v @ T
+
+    def pivot(self, row, col):
+        r, s = row-1, col-1
+        W = self.W
+        pr = W[r]
+        p = pr[s]
+        D = self.D
+        for i in range(len(W)):
+            if i == r:
+                continue
+            f = W[i][s]
+            if f:
+                W[i] = [(w*p - f*x)//D for w, x in zip(W[i], pr)]
+            else:
+                W[i] = [w*p//D for w in W[i]]
+        self.D = p
+        if p < 0:
+            self.W = [[-w for w in row] for row in W]
+            self.D = -p
+        self.labels[r] = self.header[col]
+
+    def bits(self):
+        return max(abs(w).bit_length() for row in self.W for w in row), self.D.bit_length()
+
+    def objective(self):
+        return -Fraction(self.W[-1][-1])*self.scale[-1]/(self.D*self.zscale)
+
+    def snapshot(self):
+        lis = [list(self.header)]
+        for i, row in enumerate(self.W):
+            d = self.D*self._rowscale(i)
+            lis.append([self.labels[i] if i < len(self.labels) else 'Z',
+                        *[Fraction(w)*self.scale[j]/d for j, w in enumerate(row)]])
+        return lis